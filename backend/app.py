@@ -1,10 +1,15 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from crawler import DetikCrawler
 # from r2_storage import R2Storage  # 暂时禁用R2存储
-from deepseek_client import DeepSeekClient
+from llm_router import LLMRouter, create_llm_client
 from sqlite_db import SQLiteDBManager
+from ingest_worker import news_to_row
+from article_prefetch import ArticlePrefetcher, content_to_store
+from rate_limiter import get_rate_limiter
+from dictionary import get_dictionary
 import os
+import json
 import logging
 from dotenv import load_dotenv
 
@@ -30,15 +35,21 @@ crawler = DetikCrawler()
 #     logger.warning(f"R2 storage initialization failed: {e}")
 #     logger.warning("Image processing will be skipped")
 
-# 初始化 DeepSeek 客户端
-deepseek_client = None
+# 初始化 LLM 客户端（同时配置 DeepSeek 和 Gemini 时通过 LLMRouter 按耗时和健康状况路由）
+llm_client = None
 try:
-    deepseek_client = DeepSeekClient()
-    logger.info("DeepSeek client initialized successfully")
+    llm_client = create_llm_client()
+    logger.info("LLM client initialized successfully")
 except Exception as e:
-    logger.error(f"Error initializing DeepSeek client: {e}")
+    logger.error(f"Error initializing LLM client: {e}")
     logger.warning("Translation and word analysis will be skipped")
 
+# 启用后台采集（python ingest_worker.py）时，/api/news 只读数据库，不再现场抓取
+ingest_worker_enabled = os.getenv('INGEST_WORKER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# /api/news 数据库缓存命中统计
+news_cache_stats = {'hits': 0, 'misses': 0}
+
 # 初始化 SQLite 数据库管理器
 db_manager = None
 try:
@@ -48,6 +59,12 @@ except Exception as e:
     logger.warning(f"SQLite database manager initialization failed: {e}")
     logger.warning("Database operations will be skipped")
 
+# 文章正文预取：列表抓取后在后台抓取前 N 篇文章的正文写入数据库
+article_prefetcher = None
+if db_manager and os.getenv('ARTICLE_PREFETCH_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+    prefetch_translate = os.getenv('ARTICLE_PREFETCH_TRANSLATE', 'false').lower() in ('1', 'true', 'yes')
+    article_prefetcher = ArticlePrefetcher(crawler, db_manager, translator=llm_client if prefetch_translate else None)
+
 @app.route('/api/news', methods=['GET'])
 def get_news():
     """
@@ -66,11 +83,12 @@ def get_news():
         news_list = []
         if db_manager:
             news_list = db_manager.get_news_by_date(date)
+            news_cache_stats['hits' if news_list else 'misses'] += 1
             logger.info(f"Got {len(news_list)} news items from database")
         
-        # 如果数据库中没有，从 detik.com 抓取
-        if not news_list:
-            news_list = crawler.get_news_list(date)
+        # 如果数据库中没有，从 detik.com 抓取全部分页（后台采集启用时由采集进程负责）
+        if not news_list and not ingest_worker_enabled:
+            news_list = crawler.get_all_news_list(date)
             
             # 处理图片上传到 R2（暂时禁用）
             # if r2_storage:
@@ -87,19 +105,10 @@ def get_news():
             #             processed_news_list.append(news)
             #     news_list = processed_news_list
             
-            # 翻译新闻标题（优化：只翻译前10条，避免超时）
-            if deepseek_client:
+            # 翻译新闻标题（批量翻译，整天的标题只需几次请求）
+            if llm_client:
                 try:
-                    # 只翻译前10条新闻，避免响应超时
-                    news_to_translate = news_list[:10]
-                    translated_news = deepseek_client.translate_news(news_to_translate)
-                    
-                    # 将翻译结果合并回原列表
-                    for i, news in enumerate(news_list):
-                        if i < len(translated_news):
-                            news['title_cn'] = translated_news[i].get('title_cn', news.get('title', ''))
-                        else:
-                            news['title_cn'] = news.get('title', '')
+                    news_list = llm_client.translate_news(news_list)
                 except Exception as e:
                     logger.error(f"Error translating news list: {e}")
                     # 翻译失败时，仍然返回原始数据
@@ -112,18 +121,11 @@ def get_news():
                     if 'title_cn' not in news:
                         news['title_cn'] = news.get('title', '')
             
-            # 存储到数据库
-            if db_manager:
-                for news in news_list:
-                    news_data = {
-                        'original_url': news.get('url', ''),
-                        'title_id': news.get('title', ''),
-                        'title_cn': news.get('title_cn', ''),
-                        'thumbnail_r2_url': news.get('image_url', ''),
-                        'published_at': news.get('published_at', ''),
-                        'is_crawled': False
-                    }
-                    db_manager.insert_news(news_data)
+            # 批量存储到数据库
+            if db_manager and news_list:
+                db_manager.insert_news_batch([news_to_row(news) for news in news_list])
+                if article_prefetcher:
+                    article_prefetcher.schedule(news_list)
             
         return jsonify({
             'success': True,
@@ -138,6 +140,22 @@ def get_news():
             'message': f'获取新闻列表失败: {str(e)}'
         }), 500
 
+def load_article(url):
+    """
+    获取文章详情：优先使用预取到数据库中的正文，否则现场抓取
+    """
+    cached_news = db_manager.get_news_by_url(url) if db_manager else None
+    if cached_news and cached_news.get('is_crawled') and cached_news.get('content_structure'):
+        return cached_news['content_structure']
+    return crawler.get_article_detail(url)
+
+def save_article(url, article_detail):
+    """
+    保存正文，下次直接从数据库返回；翻译全部失败（译文等于原文）时不保存译文，下次重新翻译
+    """
+    if db_manager and article_detail.get('paragraphs'):
+        db_manager.update_news_content(url, content_to_store(article_detail))
+
 @app.route('/api/article', methods=['GET'])
 def get_article():
     """
@@ -153,7 +171,13 @@ def get_article():
                 'message': '缺少文章链接参数'
             }), 400
         
-        article_detail = crawler.get_article_detail(url)
+        article_detail = load_article(url)
+        if article_detail.get('paragraphs_cn') or not llm_client:
+            return jsonify({
+                'success': True,
+                'data': article_detail,
+                'message': '获取文章详情成功'
+            })
         
         # 处理图片上传到 R2（暂时禁用）
         # if r2_storage:
@@ -172,12 +196,14 @@ def get_article():
         #         article_detail['images'] = processed_images
         
         # 翻译文章内容
-        if deepseek_client:
+        if llm_client:
             try:
-                article_detail = deepseek_client.translate_article(article_detail)
+                article_detail = llm_client.translate_article(article_detail)
             except Exception as e:
                 logger.error(f"Error translating article: {e}")
         
+        save_article(url, article_detail)
+        
         return jsonify({
             'success': True,
             'data': article_detail,
@@ -191,6 +217,67 @@ def get_article():
             'message': f'获取文章详情失败: {str(e)}'
         }), 500
 
+@app.route('/api/article/stream', methods=['GET'])
+def stream_article():
+    """
+    流式获取文章详情（Server-Sent Events）
+    先推送原文（article 事件），之后每段译文完成即推送（title / paragraph 事件），最后推送 done 事件
+    支持参数：url（文章链接）
+    """
+    url = request.args.get('url')
+    
+    if not url:
+        return jsonify({
+            'success': False,
+            'message': '缺少文章链接参数'
+        }), 400
+    
+    def sse(event, data):
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    
+    def generate():
+        try:
+            article_detail = load_article(url)
+        except Exception as e:
+            logger.error(f"Error in stream_article: {e}")
+            yield sse('error', {'message': f'获取文章详情失败: {str(e)}'})
+            return
+        
+        yield sse('article', {k: v for k, v in article_detail.items() if k not in ('paragraphs_cn', 'title_cn')})
+        
+        title = article_detail.get('title')
+        paragraphs = article_detail.get('paragraphs') or []
+        if article_detail.get('paragraphs_cn') or not llm_client:
+            # 数据库中已有译文（或未启用翻译），一次性推送
+            if article_detail.get('title_cn'):
+                yield sse('title', {'text': article_detail['title_cn']})
+            for index, text in enumerate(article_detail.get('paragraphs_cn') or []):
+                yield sse('paragraph', {'index': index, 'text': text})
+            yield sse('done', {'translated': bool(article_detail.get('paragraphs_cn'))})
+            return
+        
+        # 标题和各段落并发翻译，按完成顺序推送
+        texts = ([title] if title else []) + paragraphs
+        offset = 1 if title else 0
+        paragraphs_cn = list(paragraphs)
+        for index, text in llm_client.translate_iter(texts):
+            if index < offset:
+                article_detail['title_cn'] = text
+                yield sse('title', {'text': text})
+            else:
+                paragraphs_cn[index - offset] = text
+                yield sse('paragraph', {'index': index - offset, 'text': text})
+        
+        if paragraphs:
+            article_detail['paragraphs_cn'] = paragraphs_cn
+        save_article(url, article_detail)
+        yield sse('done', {'translated': True})
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/vocabulary', methods=['GET'])
 def get_vocabulary():
     """
@@ -232,6 +319,28 @@ def get_vocabulary():
             'message': f'获取词汇表失败: {str(e)}'
         }), 500
 
+def dictionary_entry(word, context='', allow_lemma=False):
+    """
+    从本地词典查询单词，结果字段与 analyze_word 一致
+    :param allow_lemma: 原形未收录时是否返回词根的词条（带 lemma_match 标记），用于模型不可用时的回退
+    :return: 分析结果，词典未启用或未收录时返回 None
+    """
+    dictionary = get_dictionary()
+    entry = dictionary.lookup(word) if dictionary and word else None
+    if not entry or (entry.get('lemma_match') and not allow_lemma):
+        return None
+    result = {
+        'word': word,
+        'meaning_cn': entry.get('meaning_cn', ''),
+        'root_word': entry.get('root_word', ''),
+        'pos': entry.get('pos', ''),
+        'vibe_check': entry.get('vibe_check', ''),
+        'context_sentence_id': context or ''
+    }
+    if entry.get('lemma_match'):
+        result['lemma_match'] = True
+    return result
+
 @app.route('/api/word', methods=['GET'])
 def get_word():
     """
@@ -247,19 +356,37 @@ def get_word():
                 'message': '缺少单词参数'
             }), 400
         
-        # 使用 DeepSeek 分析单词（暂时禁用）
-        # word_data = None
-        # if deepseek_client:
-        #     word_data = deepseek_client.analyze_word(word)
+        # 优先查本地词典，未收录的单词再交给 DeepSeek 分析，分析失败时退回词根的词条
+        word_data = dictionary_entry(word)
+        llm_failed = False
+        if not word_data and llm_client:
+            word_data = llm_client.analyze_word(word)
+            llm_failed = word_data is None
+        word_data = word_data or dictionary_entry(word, allow_lemma=True)
         
+        if word_data:
+            return jsonify({
+                'success': True,
+                'data': word_data,
+                'message': f'查询单词 {word} 成功'
+            })
+        
+        # 区分模型分析失败（请求出错或熔断）与词典确实未收录，避免把服务故障显示为未收录
+        if llm_failed:
+            reason, meaning = 'analysis_failed', '单词分析暂时不可用，请稍后重试'
+        elif get_dictionary():
+            reason, meaning = 'not_found', '词典未收录该单词'
+        else:
+            reason, meaning = 'dictionary_disabled', '词典未启用，无法查询该单词'
         return jsonify({
             'success': True,
-            'data': word_data if word_data else {
+            'data': {
                 'word': word,
-                'meaning': 'DeepSeek翻译功能暂时禁用',
+                'meaning': meaning,
+                'reason': reason,
                 'examples': []
             },
-            'message': f'查询单词 {word} 成功'
+            'message': f'查询单词 {word} 失败：{meaning}'
         })
         
     except Exception as e:
@@ -286,10 +413,11 @@ def analyze_word():
                 'message': '缺少单词参数'
             }), 400
         
-        # 使用 DeepSeek 分析单词
-        word_data = None
-        if deepseek_client:
-            word_data = deepseek_client.analyze_word(word, context)
+        # 优先查本地词典，未收录的单词再交给 DeepSeek 分析，分析失败时退回词根的词条
+        word_data = dictionary_entry(word, context)
+        if not word_data and llm_client:
+            word_data = llm_client.analyze_word(word, context)
+        word_data = word_data or dictionary_entry(word, context, allow_lemma=True)
         
         if word_data:
             return jsonify({
@@ -319,6 +447,63 @@ def analyze_word():
             'message': f'分析单词失败: {str(e)}'
         }), 500
 
+@app.route('/api/analyze/words', methods=['POST'])
+def analyze_words():
+    """
+    批量分析单词
+    支持参数：items（[{word, context}] 列表，至多 200 条）
+    词典收录或缓存命中的单词直接返回，其余单词合并为批量请求；分析失败的位置为 null
+    """
+    try:
+        data = request.get_json() or {}
+        items = data.get('items')
+
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                'success': False,
+                'message': '缺少 items 参数'
+            }), 400
+
+        if len(items) > 200:
+            return jsonify({
+                'success': False,
+                'message': 'items 最多 200 条'
+            }), 400
+
+        pairs = []
+        for index, item in enumerate(items):
+            word, context = (item.get('word'), item.get('context')) if isinstance(item, dict) else (item, None)
+            if not isinstance(word, str) or not word.strip() or not isinstance(context, (str, type(None))):
+                return jsonify({
+                    'success': False,
+                    'message': f'items[{index}] 格式错误：word 须为非空字符串，context 须为字符串'
+                }), 400
+            pairs.append((word, context or ''))
+
+        # 优先查本地词典，未收录的单词合并交给 DeepSeek 批量分析，分析失败时退回词根的词条
+        results = [dictionary_entry(word, context) for word, context in pairs]
+        unknown = [i for i, result in enumerate(results) if result is None]
+        if unknown and llm_client:
+            analyses = llm_client.analyze_words([pairs[i] for i in unknown])
+            for i, analysis in zip(unknown, analyses):
+                results[i] = analysis
+        for i in unknown:
+            results[i] = results[i] or dictionary_entry(*pairs[i], allow_lemma=True)
+
+        analyzed = sum(1 for result in results if result)
+        return jsonify({
+            'success': True,
+            'data': results,
+            'message': f'分析单词 {analyzed}/{len(pairs)} 个成功'
+        })
+
+    except Exception as e:
+        logger.error(f"Error in analyze_words: {e}")
+        return jsonify({
+            'success': False,
+            'message': f'批量分析单词失败: {str(e)}'
+        }), 500
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """
@@ -327,7 +512,17 @@ def health_check():
     return jsonify({
         'success': True,
         'message': '服务正常运行',
-        'timestamp': 'now()'
+        'timestamp': 'now()',
+        'http_cache': crawler.http_cache.stats() if crawler.http_cache else None,
+        'selectors': crawler.parser.cascade.stats(),
+        'rate_limits': get_rate_limiter().stats(),
+        'llm_router': llm_client.stats() if isinstance(llm_client, LLMRouter) else None,
+        'llm_circuit': llm_client.circuit_breaker.stats() if getattr(llm_client, 'circuit_breaker', None) else None,
+        'prefetch': article_prefetcher.stats() if article_prefetcher else None,
+        'translation_cache': llm_client.translation_cache.stats() if llm_client and llm_client.translation_cache else None,
+        'dictionary': get_dictionary().stats() if get_dictionary() else None,
+        'word_analysis_cache': llm_client.word_cache.stats() if llm_client and llm_client.word_cache else None,
+        'news_cache': dict(news_cache_stats, hit_rate=round(news_cache_stats['hits'] / max(1, sum(news_cache_stats.values())), 3))
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,101 @@
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def content_to_store(article_detail):
+    """
+    要写入数据库的正文：翻译全部失败（译文等于原文）时去掉译文，下次打开时重新翻译
+    :param article_detail: 文章详情（可能带 paragraphs_cn / title_cn）
+    """
+    if article_detail.get('paragraphs_cn') == article_detail.get('paragraphs'):
+        return {k: v for k, v in article_detail.items() if k not in ('paragraphs_cn', 'title_cn')}
+    return article_detail
+
+class ArticlePrefetcher:
+    def __init__(self, crawler, db_manager, translator=None, top_n=None, max_workers=None):
+        """
+        文章正文预取：列表抓取完成后，在后台抓取排在前面的文章正文并写入 news_feed，
+        让大部分文章打开时直接从数据库返回
+        :param crawler: DetikCrawler 实例
+        :param db_manager: SQLiteDBManager 实例
+        :param translator: 翻译客户端，提供时同时预翻译正文
+        :param top_n: 每个列表预取的文章数，默认读取 ARTICLE_PREFETCH_TOP_N
+        :param max_workers: 后台线程数，默认读取 ARTICLE_PREFETCH_WORKERS
+        """
+        self.crawler = crawler
+        self.db_manager = db_manager
+        self.translator = translator
+        self.top_n = top_n if top_n is not None else int(os.getenv('ARTICLE_PREFETCH_TOP_N', 10))
+        max_workers = max_workers or int(os.getenv('ARTICLE_PREFETCH_WORKERS', 3))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self.prefetched = 0
+        self.failed = 0
+
+    def schedule(self, news_list):
+        """
+        提交列表前 top_n 条中尚未抓取正文的文章，立即返回
+        :param news_list: 新闻列表（url 或 original_url 字段）
+        :return: 提交的文章数
+        """
+        urls = [news.get('url') or news.get('original_url') for news in news_list[:self.top_n]]
+        urls = [url for url in urls if url]
+        if not urls:
+            return 0
+
+        crawled = self.db_manager.get_crawled_urls(urls)
+        submitted = 0
+        with self._lock:
+            for url in urls:
+                if url in crawled or url in self._inflight:
+                    continue
+                self._inflight.add(url)
+                self.executor.submit(self._prefetch, url)
+                submitted += 1
+        if submitted:
+            logger.info(f"Prefetching {submitted} articles")
+        return submitted
+
+    def _prefetch(self, url):
+        stored = False
+        try:
+            article_detail = self.crawler.get_article_detail(url)
+            if not article_detail.get('paragraphs'):
+                logger.warning(f"Prefetch got no paragraphs for {url}")
+                return
+
+            if self.translator:
+                try:
+                    article_detail = self.translator.translate_article(article_detail)
+                except Exception as e:
+                    logger.error(f"Error translating prefetched article: {e}")
+
+            stored = self.db_manager.update_news_content(url, content_to_store(article_detail)) is not None
+        except Exception as e:
+            logger.error(f"Error prefetching {url}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(url)
+                if stored:
+                    self.prefetched += 1
+                else:
+                    self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'prefetched': self.prefetched,
+                'failed': self.failed,
+                'inflight': len(self._inflight)
+            }
+
+    def shutdown(self, wait=True):
+        """
+        停止接收新任务，默认等待正在进行的预取完成
+        """
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from urllib.parse import urlparse
+
+from crawler import DetikCrawler
+from url_dedup import CrawlSession
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AsyncCrawlEngine:
+    def __init__(self, crawler=None, max_per_host=8, deadline=60, fallback_to_homepage=None):
+        """
+        并发抓取引擎：索引页与文章详情并发抓取，解析完成即产出
+        :param crawler: DetikCrawler 实例（复用其连接池和解析逻辑）；请求仍经过其传输层的限速器，
+                        实际速率受 RATE_LIMITS / RATE_LIMIT_DEFAULT 约束，本地镜像可传入使用 NullLimiter 的传输层
+        :param max_per_host: 每个主机的最大并发请求数
+        :param deadline: 整次抓取共享的截止时间（秒）
+        :param fallback_to_homepage: 日期索引 404 时是否回退到主页，默认沿用 crawler.fallback_to_homepage
+        """
+        self.crawler = crawler or DetikCrawler()
+        self.fallback_to_homepage = self.crawler.fallback_to_homepage if fallback_to_homepage is None else fallback_to_homepage
+        self.max_per_host = max_per_host
+        self.deadline = deadline
+        self._semaphores = {}
+
+    def _semaphore(self, url):
+        """
+        获取主机对应的并发信号量
+        """
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+    async def _fetch(self, url, expires_at, timeout=30):
+        """
+        在共享截止时间内抓取页面，阻塞 I/O 交给线程池执行
+        :return: requests.Response
+        """
+        async with self._semaphore(url):
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"Deadline reached before fetching {url}")
+            return await asyncio.wait_for(
+                asyncio.to_thread(self.crawler.transport.get, url, timeout=min(timeout, remaining)),
+                timeout=remaining
+            )
+
+    async def _fetch_index(self, date, expires_at, session):
+        """
+        抓取并解析所有索引分页，404 时按 fallback_to_homepage 回退到主页或返回空列表（与 DetikCrawler.get_news_list 一致）
+        其余分页并发抓取、按页码顺序合并，某一页没有新 URL 时提前停止
+        """
+        url = self.crawler.index_url(date)
+        response = await self._fetch(url, expires_at, timeout=60)
+        if response.status_code == 404:
+            if not self.fallback_to_homepage:
+                logger.warning(f"Date {date} not found")
+                return []
+            logger.warning(f"Date {date} not found, falling back to main page")
+            response = await self._fetch(f"{self.crawler.base_url}/", expires_at, timeout=60)
+            response.raise_for_status()
+            return await asyncio.to_thread(self.crawler.parse_news_list, response.content, session)
+        response.raise_for_status()
+
+        page_count = min(self.crawler.parse_page_count(response.content), self.crawler.max_index_pages)
+        news_list = await asyncio.to_thread(self.crawler.parse_news_list, response.content, session)
+
+        tasks = [
+            asyncio.create_task(self._fetch(self.crawler.index_url(date, page), expires_at, timeout=60))
+            for page in range(2, page_count + 1)
+        ]
+        try:
+            for page, task in enumerate(tasks, start=2):
+                try:
+                    page_response = await task
+                    page_response.raise_for_status()
+                except asyncio.TimeoutError:
+                    logger.warning(f"Deadline reached for index page {page}")
+                    break
+                except Exception as e:
+                    logger.error(f"Error crawling index page {page} for {date}: {e}")
+                    continue
+                page_items = await asyncio.to_thread(self.crawler.parse_news_list, page_response.content, session)
+                if not page_items:
+                    logger.info(f"Page {page} has no new URLs, stopping pagination")
+                    break
+                news_list.extend(page_items)
+        finally:
+            for task in tasks:
+                task.cancel()
+        return news_list
+
+    async def _fetch_article(self, news, expires_at):
+        """
+        抓取并解析文章详情，失败时返回不带详情的新闻条目
+        """
+        try:
+            response = await self._fetch(news['url'], expires_at)
+            response.raise_for_status()
+            news['detail'] = await asyncio.to_thread(self.crawler.parse_article_detail, response.content)
+        except asyncio.TimeoutError:
+            logger.warning(f"Deadline reached for article: {news['url']}")
+        except Exception as e:
+            logger.error(f"Error crawling article detail {news['url']}: {e}")
+        return news
+
+    async def crawl_date(self, date, with_details=True):
+        """
+        抓取指定日期的新闻，异步生成器，每条新闻解析完成后立即产出
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param with_details: 是否同时抓取文章详情（结果放在 'detail' 字段）
+        """
+        expires_at = time.monotonic() + self.deadline
+        # 信号量绑定事件循环，每次抓取重新创建
+        self._semaphores = {}
+        session = CrawlSession()
+        try:
+            news_list = await self._fetch_index(date, expires_at, session)
+        except Exception as e:
+            logger.error(f"Error crawling news list: {e}")
+            return
+
+        if not with_details:
+            for news in news_list:
+                yield news
+            return
+
+        tasks = [asyncio.create_task(self._fetch_article(news, expires_at)) for news in news_list]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def crawl_date_sync(self, date, with_details=True):
+        """
+        同步封装：抓取指定日期的新闻并返回列表
+        """
+        async def collect():
+            return [news async for news in self.crawl_date(date, with_details)]
+
+        return asyncio.run(collect())
+
+if __name__ == "__main__":
+    from datetime import datetime, timedelta
+
+    engine = AsyncCrawlEngine()
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    start = time.monotonic()
+    results = engine.crawl_date_sync(yesterday)
+    with_detail = sum(1 for news in results if news.get('detail'))
+    logger.info(f"Crawled {len(results)} news items ({with_detail} with details) in {time.monotonic() - start:.1f}s")
@@ -0,0 +1,164 @@
+"""
+历史新闻回填：按日期范围在进程池中并行抓取每天的索引，
+所有进程共享一个全局限速（礼貌间隔），进度记录在抓取边界中，中断后重新运行即可继续
+
+用法：
+  python backfill.py 2025-06-01 2025-09-30 [--workers 4] [--rate 2] [--translate]
+
+子进程只负责抓取并登记到抓取边界，翻译和批量写入数据库都在主进程中完成；
+未翻译（未加 --translate 或翻译失败）的新闻以原标题入库，保持未翻译状态，之后加 --translate 重新运行即可补译
+"""
+import argparse
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from crawl_frontier import CrawlFrontier
+from ingest_worker import news_to_row, is_translated, translate_titles, create_translator
+from sqlite_db import SQLiteDBManager
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class PolitenessLimiter:
+    def __init__(self, lock, next_allowed, interval, inner=None):
+        """
+        跨进程的全局请求间隔：所有进程的请求按顺序领取发送时刻，相邻两次至少间隔 interval 秒
+        :param lock: multiprocessing.Lock
+        :param next_allowed: multiprocessing.Value('d')，下一次允许发送的时间戳
+        :param interval: 最小请求间隔（秒）
+        :param inner: 进程内的按主机限速器，继续负责 429 自适应降速
+        """
+        self.lock = lock
+        self.next_allowed = next_allowed
+        self.interval = interval
+        self.inner = inner
+
+    def acquire(self, url=None):
+        """
+        领取下一个发送时刻并等待到该时刻
+        """
+        with self.lock:
+            now = time.time()
+            send_at = max(now, self.next_allowed.value)
+            self.next_allowed.value = send_at + self.interval
+        if send_at > now:
+            time.sleep(send_at - now)
+        if self.inner is not None:
+            self.inner.acquire(url)
+
+    def report(self, url, status_code, retry_after=None):
+        if self.inner is not None:
+            self.inner.report(url, status_code, retry_after)
+
+# 子进程内的爬虫和抓取边界，由 _init_worker 创建
+_crawler = None
+_frontier = None
+
+def _init_worker(lock, next_allowed, interval, state_db):
+    global _crawler, _frontier
+    from crawler import DetikCrawler
+
+    _crawler = DetikCrawler()
+    # 历史日期的索引不存在时不回退到主页，否则会把当天的新闻记到历史日期下
+    _crawler.fallback_to_homepage = False
+    _crawler.transport.limiter = PolitenessLimiter(lock, next_allowed, interval, _crawler.transport.limiter)
+    _frontier = CrawlFrontier(state_db)
+
+def crawl_day(date):
+    """
+    在子进程中抓取一天的索引并登记到抓取边界（已完整抓取的日期不再重新抓取）
+    :return: (日期, 待翻译的新闻, 已翻译待入库的新闻)
+    """
+    if not _frontier.is_indexed(date):
+        news_list, complete = _crawler.crawl_index(date)
+        _frontier.discover(date, news_list)
+        if complete:
+            _frontier.mark_indexed(date)
+    return date, _frontier.items(date, before_state='translated'), _frontier.items(date, state='translated')
+
+def date_range(start, end):
+    day = datetime.strptime(start, '%Y-%m-%d')
+    last = datetime.strptime(end, '%Y-%m-%d')
+    while day <= last:
+        yield day.strftime('%Y-%m-%d')
+        day += timedelta(days=1)
+
+def store_day(date, pending, translated, frontier, db_manager, translator):
+    """
+    在主进程中翻译并批量写入一天的新闻
+    只有真正翻译过的条目推进为已翻译、已入库；其余条目以原标题写入，状态不变，留待之后重试翻译
+    :return: 写入的新闻数量
+    """
+    if pending:
+        pending = translate_titles(translator, pending)
+        frontier.advance_many([(news['url'], news) for news in pending if is_translated(news)], 'translated')
+    ready = translated + pending
+    if not ready:
+        return 0
+
+    if not db_manager.insert_news_batch([news_to_row(news) for news in ready]):
+        for news in ready:
+            frontier.record_failure(news['url'], 'insert_news_batch failed')
+        return 0
+    done = translated + [news for news in pending if is_translated(news)]
+    frontier.advance_many([(news['url'], None) for news in done], 'stored')
+    return len(ready)
+
+def backfill(start, end, workers=4, rate=2.0, db_path='news_data.db', state_db=None, translator=None):
+    """
+    回填日期范围内（含首尾）的新闻
+    :param rate: 所有进程合计每秒最多请求数
+    :return: (处理的天数, 写入的新闻数量)
+    """
+    frontier = CrawlFrontier(state_db)
+    db_manager = SQLiteDBManager(db_path)
+    dates = [date for date in date_range(start, end) if not frontier.is_complete(date)]
+    skipped = sum(1 for _ in date_range(start, end)) - len(dates)
+    logger.info(f"Backfilling {len(dates)} days ({skipped} already complete) with {workers} workers at {rate} req/s")
+
+    ctx = multiprocessing.get_context('spawn')
+    lock = ctx.Lock()
+    next_allowed = ctx.Value('d', 0.0, lock=False)
+    started = time.monotonic()
+    days = articles = 0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                             initargs=(lock, next_allowed, 1.0 / rate, state_db)) as executor:
+        futures = {executor.submit(crawl_day, date): date for date in dates}
+        for future in as_completed(futures):
+            try:
+                date, pending, translated = future.result()
+                articles += store_day(date, pending, translated, frontier, db_manager, translator)
+            except Exception as e:
+                logger.error(f"Error backfilling {futures[future]}: {e}")
+                continue
+            days += 1
+            minutes = max(time.monotonic() - started, 1e-6) / 60
+            print(f"[{days}/{len(dates)}] {date}: {days / minutes:.1f} days/min, {articles / minutes:.1f} articles/min")
+
+    minutes = max(time.monotonic() - started, 1e-6) / 60
+    print(f"Done: {days} days, {articles} articles in {minutes:.1f} min "
+          f"({days / minutes:.1f} days/min, {articles / minutes:.1f} articles/min)")
+    db_manager.close()
+    return days, articles
+
+def main():
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    parser = argparse.ArgumentParser(description='Parallel historical news backfill')
+    parser.add_argument('start', help='first date (YYYY-MM-DD)')
+    parser.add_argument('end', nargs='?', default=yesterday, help='last date (YYYY-MM-DD), defaults to yesterday')
+    parser.add_argument('--workers', type=int, default=4, help='crawler processes')
+    parser.add_argument('--rate', type=float, default=2.0, help='global request rate limit (requests/s)')
+    parser.add_argument('--translate', action='store_true', help='translate titles with DeepSeek before storing')
+    parser.add_argument('--db', default='news_data.db', help='SQLite database path')
+    parser.add_argument('--state-db', help='crawler state database (frontier), defaults to CRAWLER_STATE_DB')
+    args = parser.parse_args()
+
+    translator = create_translator() if args.translate else None
+    backfill(args.start, args.end, args.workers, args.rate, args.db, args.state_db, translator)
+
+if __name__ == "__main__":
+    main()
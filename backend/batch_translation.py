@@ -0,0 +1,104 @@
+import re
+import json
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 单次批量请求的输入 token 预算和条数上限
+BATCH_INPUT_TOKENS = 2000
+BATCH_MAX_ITEMS = 50
+# 单次请求的输出 token 上限（deepseek-chat 最多 8K）
+MAX_OUTPUT_TOKENS = 8192
+
+def estimate_tokens(text):
+    """
+    粗略估算 token 数：拉丁字母约 3 个字符一个 token，中日韩字符约一个字一个 token
+    """
+    if not text:
+        return 0
+    cjk = len(re.findall(r'[\u3000-\u9fff\uf900-\ufaff]', text))
+    return cjk + (len(text) - cjk) // 3 + 1
+
+def split_by_budget(texts, max_tokens=BATCH_INPUT_TOKENS, max_items=BATCH_MAX_ITEMS):
+    """
+    按 token 预算把文本切分为多个批次，保持原有顺序
+    :param texts: 文本列表
+    :return: 批次列表，每个批次为原列表中的下标列表
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def build_batch_prompt(texts, target_language='zh-CN'):
+    """
+    构造批量翻译提示词：输入为带编号的 JSON 数组，要求输出等长的 JSON 数组
+    """
+    items = [{'id': i + 1, 'text': text} for i, text in enumerate(texts)]
+    return (
+        f"请将下面 JSON 数组中每一条印尼语文本翻译成{target_language}，保持原意准确，语言自然流畅。\n"
+        f"只输出一个 JSON 数组，共 {len(texts)} 个元素，格式为 "
+        f"[{{\"id\": 编号, \"translation\": \"译文\"}}]，编号与输入一一对应，不要输出其他内容。\n\n"
+        f"{json.dumps(items, ensure_ascii=False)}"
+    )
+
+def batch_max_tokens(texts):
+    """
+    按输入长度估算批量请求所需的输出 token 数（译文加 JSON 结构开销）
+    """
+    needed = sum(estimate_tokens(text) for text in texts) * 2 + 20 * len(texts) + 64
+    return min(MAX_OUTPUT_TOKENS, needed)
+
+def parse_batch_response(content, expected):
+    """
+    将批量翻译结果映射回输入顺序
+    优先按 JSON 数组中的 id 映射，其次按数组位置，最后尝试 "1. 译文" 形式的编号行
+    :param content: 模型输出
+    :param expected: 输入条数
+    :return: 长度为 expected 的列表，无法解析的位置为 None
+    """
+    results = [None] * expected
+    if not content:
+        return results
+
+    # 去掉 ```json 代码块包裹
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', content.strip())
+    start, end = text.find('['), text.rfind(']')
+    items = None
+    if start != -1 and end > start:
+        try:
+            items = json.loads(text[start:end + 1])
+        except ValueError:
+            items = None
+
+    if isinstance(items, list):
+        for position, item in enumerate(items):
+            if isinstance(item, dict):
+                index = item.get('id')
+                value = item.get('translation', item.get('text'))
+                try:
+                    index = int(index) - 1
+                except (TypeError, ValueError):
+                    index = position
+            else:
+                index, value = position, item
+            if 0 <= index < expected and isinstance(value, str) and value.strip() and results[index] is None:
+                results[index] = value.strip()
+        return results
+
+    for match in re.finditer(r'^\s*(\d+)[.、)]\s*(.+?)\s*$', text, re.MULTILINE):
+        index = int(match.group(1)) - 1
+        if 0 <= index < expected and results[index] is None:
+            results[index] = match.group(2)
+    return results
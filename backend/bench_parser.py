@@ -0,0 +1,105 @@
+"""
+解析后端基准测试：在保存的 detik 页面语料上比较各后端的解析速度（页/秒）和峰值内存
+
+用法：
+  python bench_parser.py --save corpus --articles 30    # 抓取昨天的索引页和文章保存为语料
+  python bench_parser.py --corpus corpus [--rounds 5]   # 对语料运行基准测试
+
+语料目录中文件名以 index 开头的视为索引页，其余视为文章页；
+每个后端在独立进程中运行，峰值内存为 ru_maxrss 增量（包含 C 扩展分配）
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+from datetime import datetime, timedelta
+
+from page_parser import SoupBackend, SelectolaxBackend, LXML_AVAILABLE, SELECTOLAX_AVAILABLE
+
+def available_backends():
+    # 基线：旧实现（html.parser 构建整棵树）
+    backends = [('html.parser-full', lambda: SoupBackend('html.parser', strain=False)),
+                ('html.parser-strained', lambda: SoupBackend('html.parser'))]
+    if LXML_AVAILABLE:
+        backends.append(('lxml-strained', lambda: SoupBackend('lxml')))
+    if SELECTOLAX_AVAILABLE:
+        backends.append(('selectolax', SelectolaxBackend))
+    return backends
+
+def load_corpus(corpus_dir):
+    pages = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.endswith('.html'):
+            continue
+        with open(os.path.join(corpus_dir, name), 'rb') as f:
+            pages.append((name.startswith('index'), f.read()))
+    return pages
+
+def run_backend(name, corpus_dir, rounds, queue):
+    factory = dict(available_backends())[name]
+    backend = factory()
+    pages = load_corpus(corpus_dir)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for is_index, content in pages:
+            if is_index:
+                backend.parse_cards(content)
+            else:
+                backend.parse_article(content)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb
+    queue.put((name, len(pages) * rounds / elapsed, peak_kb))
+
+def save_corpus(corpus_dir, max_articles):
+    from crawler import DetikCrawler
+
+    os.makedirs(corpus_dir, exist_ok=True)
+    crawler = DetikCrawler()
+    date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    response = crawler.transport.get(crawler.index_url(date), timeout=60)
+    response.raise_for_status()
+    with open(os.path.join(corpus_dir, 'index-1.html'), 'wb') as f:
+        f.write(response.content)
+
+    for i, news in enumerate(crawler.parse_news_list(response.content)[:max_articles]):
+        try:
+            article = crawler.transport.get(news['url'], timeout=30)
+            article.raise_for_status()
+            with open(os.path.join(corpus_dir, f'article-{i:03d}.html'), 'wb') as f:
+                f.write(article.content)
+        except Exception as e:
+            print(f"skip {news['url']}: {e}")
+    print(f"Saved corpus to {corpus_dir}")
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML parser backend benchmark')
+    parser.add_argument('--corpus', help='directory of saved detik pages')
+    parser.add_argument('--save', help='fetch and save a fresh corpus into this directory')
+    parser.add_argument('--articles', type=int, default=30)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.save:
+        save_corpus(args.save, args.articles)
+        return
+    if not args.corpus:
+        parser.error('--corpus or --save is required')
+
+    pages = load_corpus(args.corpus)
+    print(f"{len(pages)} pages x {args.rounds} rounds")
+
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    for name, _ in available_backends():
+        process = ctx.Process(target=run_backend, args=(name, args.corpus, args.rounds, queue))
+        process.start()
+        process.join()
+        name, pages_per_sec, peak_kb = queue.get()
+        print(f"{name:<22} {pages_per_sec:8.1f} pages/s  peak +{peak_kb / 1024:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+流式抓取基准测试：对比完整下载后解析与流式解析（正文结束即停止）
+的传输字节数和解析耗时
+
+用法：python bench_streaming.py [--requests 20] [--tail-kb 400] [--kbps 20000]
+--tail-kb 正文之后的页脚/相关链接/脚本大小，--kbps 模拟的下行带宽
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 基准测试不使用磁盘缓存，确保每次都真正下载
+os.environ['CRAWLER_CACHE_DIR'] = ''
+
+from crawler import DetikCrawler
+from http_transport import HTTPTransport
+from rate_limiter import NullLimiter
+
+CHUNK_SIZE = 16 * 1024
+
+def build_article(tail_kb):
+    head = (
+        "<html><head><title>detik</title></head><body>"
+        "<h1 class=\"detail__title\">Presiden meninjau pembangunan IKN</h1>"
+        "<div class=\"detail__date\">Senin, 13 Okt 2025 10:00 WIB</div>"
+        "<div class=\"detail__body\">"
+        + "<p>Pembangunan infrastruktur telah mencapai 80 persen, kata Presiden.</p>" * 25
+        + "</div>"
+    )
+    tail = "<div class=\"related\">" + "<a href=\"/news/d-1\">Berita terkait lainnya</a>" * (tail_kb * 1024 // 42) + "</div></body></html>"
+    return (head + tail).encode('utf-8')
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    body = b''
+    chunk_delay = 0.0
+    bytes_sent = []
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        sent = 0
+        try:
+            for i in range(0, len(self.body), CHUNK_SIZE):
+                self.wfile.write(self.body[i:i + CHUNK_SIZE])
+                sent += len(self.body[i:i + CHUNK_SIZE])
+                time.sleep(self.chunk_delay)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        StubHandler.bytes_sent.append(sent)
+
+    def log_message(self, format, *args):
+        pass
+
+def measure(crawler, url, count, stream):
+    StubHandler.bytes_sent = []
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        article = crawler.get_article_detail(url, stream=stream)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert article['paragraphs'], 'article body was not parsed'
+    # 等待服务端统计最后一次发送的字节数
+    time.sleep(0.2)
+    return latencies, StubHandler.bytes_sent
+
+def report(name, latencies, bytes_sent):
+    print(f"{name:<7} mean={statistics.mean(latencies):8.2f}ms  p50={statistics.median(latencies):8.2f}ms  "
+          f"bytes/article={statistics.mean(bytes_sent) / 1024:8.1f}KB")
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming vs full article fetch benchmark')
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--tail-kb', type=int, default=400)
+    parser.add_argument('--kbps', type=int, default=20000, help='simulated bandwidth in KB/s')
+    args = parser.parse_args()
+
+    StubHandler.body = build_article(args.tail_kb)
+    StubHandler.chunk_delay = CHUNK_SIZE / 1024 / args.kbps
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/news/d-1/artikel"
+
+    try:
+        # 本地桩服务器不需要限速，避免令牌桶等待计入耗时
+        crawler = DetikCrawler(transport=HTTPTransport(limiter=NullLimiter()))
+        print(f"page size {len(StubHandler.body) / 1024:.0f}KB, bandwidth {args.kbps}KB/s, {args.requests} articles per mode")
+        report('full', *measure(crawler, url, args.requests, stream=False))
+        report('stream', *measure(crawler, url, args.requests, stream=True))
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+连接池基准测试：对比冷连接（每次新建 TCP 连接）与热连接（keep-alive 连接池）
+在本地桩服务器上抓取文章的单篇延迟
+
+用法：python bench_transport.py [--requests 200] [--connect-delay 0.02]
+--connect-delay 模拟每个新连接的 TCP+TLS 握手耗时（秒）
+"""
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from crawler import DetikCrawler
+from http_transport import HTTPTransport
+from rate_limiter import NullLimiter
+
+ARTICLE_HTML = (
+    "<html><body>"
+    "<h1 class=\"detail__title\">Presiden meninjau pembangunan IKN</h1>"
+    "<div class=\"detail__date\">Senin, 13 Okt 2025 10:00 WIB</div>"
+    "<div class=\"detail__body\">"
+    + "<p>Pembangunan infrastruktur telah mencapai 80 persen.</p>" * 20
+    + "</div></body></html>"
+).encode('utf-8')
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connect_delay = 0.0
+
+    def setup(self):
+        # 每个新连接只付一次握手开销
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        # 响应头和响应体一次写出，避免 Nagle/延迟 ACK 干扰 keep-alive 测量
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(ARTICLE_HTML)))
+        self._headers_buffer.append(b"\r\n")
+        self.wfile.write(b"".join(self._headers_buffer) + ARTICLE_HTML)
+        self._headers_buffer = []
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(connect_delay):
+    StubHandler.connect_delay = connect_delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+class ColdTransport:
+    """
+    每次请求都使用模块级 requests.get（旧实现），不复用连接
+    """
+    def __init__(self, headers):
+        self.headers = headers
+
+    def get(self, url, headers=None, timeout=30, stream=False):
+        return requests.get(url, headers={**self.headers, **(headers or {})}, timeout=timeout, stream=stream)
+
+def measure(crawler, url, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        crawler.get_article_detail(url)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:<6} mean={statistics.mean(latencies):7.2f}ms  p50={statistics.median(latencies):7.2f}ms  p95={p95:7.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold vs warm connection latency benchmark')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--connect-delay', type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.connect_delay)
+    url = f"http://127.0.0.1:{server.server_address[1]}/news/d-1/artikel"
+
+    try:
+        cold = DetikCrawler()
+        cold.transport = ColdTransport(cold.headers)
+        # 冷连接不经过限速器，热连接也不限速，只比较连接开销
+        warm = DetikCrawler(transport=HTTPTransport(headers=cold.headers, limiter=NullLimiter()))
+        # 预热：建立一次连接
+        warm.get_article_detail(url)
+
+        print(f"{args.requests} articles per mode, simulated handshake {args.connect_delay * 1000:.0f}ms")
+        report('cold', measure(cold, url, args.requests))
+        report('warm', measure(warm, url, args.requests))
+        warm.transport.close()
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import time
+import threading
+import logging
+
+from rate_limiter import is_rate_limited
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """
+    熔断器处于打开状态时直接抛出，不再发出请求
+    消息中包含 quota 字样，调用方按配额错误处理（回退到缓存或原文）
+    """
+
+def is_quota_error(error):
+    """
+    判断异常是否为配额耗尽（余额不足等），这类错误短时间内不会自行恢复
+    """
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if status == 402:
+        return True
+    # 只匹配明确的措辞，不按 "402" 子串判断（请求 ID、token 数等也可能包含）
+    message = str(error).lower()
+    return 'quota' in message or 'insufficient balance' in message or 'payment required' in message
+
+class CircuitBreaker:
+    def __init__(self, name, threshold=None, cooldown=None, max_cooldown=None):
+        """
+        LLM 请求熔断器（每个客户端实例一个）：
+        closed    正常放行；配额错误立即打开，连续 threshold 次 429 后打开
+        open      冷却期内所有请求直接失败（CircuitOpenError），调用方回退到缓存或原文
+        half_open 冷却结束后只放行一个试探请求：成功则关闭，配额/限流错误则重新打开并加倍冷却时间
+        :param name: 名称，用于日志
+        :param threshold: 打开前允许的连续 429 次数，默认读取 LLM_BREAKER_THRESHOLD
+        :param cooldown: 首次打开的冷却秒数，默认读取 LLM_BREAKER_COOLDOWN
+        :param max_cooldown: 冷却秒数上限，默认读取 LLM_BREAKER_MAX_COOLDOWN
+        """
+        self.name = name
+        self.threshold = threshold or int(os.getenv('LLM_BREAKER_THRESHOLD', 3))
+        self.base_cooldown = cooldown or float(os.getenv('LLM_BREAKER_COOLDOWN', 60))
+        self.max_cooldown = max_cooldown or float(os.getenv('LLM_BREAKER_MAX_COOLDOWN', 600))
+        self.cooldown = self.base_cooldown
+        self.state = CLOSED
+        self.consecutive = 0
+        self.opened_until = 0.0
+        self.probing = False
+        self.opens = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        请求前调用：打开状态下直接抛出 CircuitOpenError
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN and now >= self.opened_until:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                logger.info(f"Circuit {self.name} half-open, sending probe request")
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.opened_until - now)
+        raise CircuitOpenError(f"Circuit {self.name} open after quota/rate limit errors, retry in {retry_in:.0f}s")
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self.state = CLOSED
+            self.consecutive = 0
+            self.probing = False
+            self.cooldown = self.base_cooldown
+
+    def record_failure(self, error):
+        """
+        请求失败后调用：只有配额和限流错误计入，其他错误只释放试探名额
+        """
+        quota = is_quota_error(error)
+        if not quota and not is_rate_limited(error):
+            with self._lock:
+                self.probing = False
+            return
+
+        with self._lock:
+            self.consecutive += 1
+            if self.state == HALF_OPEN:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            elif self.state == OPEN or (not quota and self.consecutive < self.threshold):
+                return
+            self.state = OPEN
+            self.probing = False
+            self.opened_until = time.monotonic() + self.cooldown
+            self.opens += 1
+        logger.warning(f"Circuit {self.name} opened for {self.cooldown:.0f}s: {error}")
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'opens': self.opens,
+                'rejected': self.rejected,
+                'retry_in': round(max(0.0, self.opened_until - time.monotonic())) if self.state == OPEN else 0
+            }
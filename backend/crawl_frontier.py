@@ -0,0 +1,161 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 标题流水线状态，按先后顺序排列，只允许向前推进
+# 文章正文是否已抓取由 news_feed.is_crawled 记录，ArticlePrefetcher 据此跳过已抓取的正文
+STATES = ['discovered', 'translated', 'stored']
+STATE_RANK = {state: rank for rank, state in enumerate(STATES)}
+
+class CrawlFrontier:
+    def __init__(self, db_path=None):
+        """
+        持久化抓取边界：记录每个发现的 URL 及其所处的流水线状态、尝试次数和时间戳，
+        重启后从中断处继续，已完成的步骤不再重复
+        :param db_path: SQLite 文件路径，默认读取 CRAWLER_STATE_DB
+        """
+        self.db_path = db_path or os.getenv('CRAWLER_STATE_DB', 'crawler_state.db')
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.init_tables()
+
+    def init_tables(self):
+        """
+        初始化 crawl_frontier 表
+        """
+        with self._lock, self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS crawl_frontier (
+                    url TEXT PRIMARY KEY,
+                    date TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    state_rank INTEGER NOT NULL,
+                    attempts INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    payload TEXT,
+                    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_crawl_frontier_date_rank ON crawl_frontier(date, state_rank)')
+            # 状态表调整后按状态名重新同步 state_rank
+            self.conn.executemany(
+                'UPDATE crawl_frontier SET state_rank = ? WHERE state = ? AND state_rank != ?',
+                [(rank, state, rank) for state, rank in STATE_RANK.items()]
+            )
+            # 索引完整抓取（所有分页成功）的日期，部分失败的日期不记录，下次重新抓取
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS crawl_index (
+                    date TEXT PRIMARY KEY,
+                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+    def discover(self, date, news_list):
+        """
+        记录索引页发现的新闻，已存在的 URL 保持原状态
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param news_list: 新闻列表（需包含 url 字段）
+        :return: 新发现的数量
+        """
+        with self._lock, self.conn:
+            start = self.conn.execute(
+                'SELECT COALESCE(MAX(position) + 1, 0) FROM crawl_frontier WHERE date = ?', (date,)
+            ).fetchone()[0]
+            before = self.conn.total_changes
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO crawl_frontier (url, date, position, state, state_rank, payload) VALUES (?, ?, ?, ?, 0, ?)',
+                [(news['url'], date, start + i, 'discovered', json.dumps(news, ensure_ascii=False))
+                 for i, news in enumerate(news_list)]
+            )
+            added = self.conn.total_changes - before
+        logger.info(f"Frontier {date}: discovered {added} new URLs")
+        return added
+
+    def advance_many(self, items, state):
+        """
+        批量推进状态
+        :param items: (url, payload) 列表
+        :param state: 目标状态
+        """
+        rank = STATE_RANK[state]
+        with self._lock, self.conn:
+            self.conn.executemany('''
+                UPDATE crawl_frontier
+                SET state = ?, state_rank = ?, payload = COALESCE(?, payload), last_error = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE url = ? AND state_rank < ?
+            ''', [(state, rank, json.dumps(payload, ensure_ascii=False) if payload is not None else None, url, rank)
+                  for url, payload in items])
+
+    def record_failure(self, url, error):
+        """
+        记录一次失败的尝试
+        """
+        with self._lock, self.conn:
+            self.conn.execute('''
+                UPDATE crawl_frontier SET attempts = attempts + 1, last_error = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE url = ?
+            ''', (str(error)[:500], url))
+
+    def items(self, date, before_state=None, state=None):
+        """
+        按发现顺序获取某日期的新闻负载
+        :param before_state: 只返回尚未到达该状态的条目
+        :param state: 只返回正处于该状态的条目
+        :return: 新闻字典列表
+        """
+        sql = 'SELECT payload FROM crawl_frontier WHERE date = ?'
+        params = [date]
+        if before_state:
+            sql += ' AND state_rank < ?'
+            params.append(STATE_RANK[before_state])
+        if state:
+            sql += ' AND state_rank = ?'
+            params.append(STATE_RANK[state])
+        sql += ' ORDER BY position'
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row['payload']) for row in rows]
+
+    def mark_indexed(self, date):
+        """
+        记录该日期的索引已完整抓取
+        """
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO crawl_index (date) VALUES (?)', (date,))
+
+    def is_indexed(self, date):
+        """
+        该日期的索引是否已经完整抓取过（只有部分分页成功时为 False）
+        """
+        with self._lock:
+            row = self.conn.execute('SELECT 1 FROM crawl_index WHERE date = ?', (date,)).fetchone()
+        return row is not None
+
+    def progress(self, date):
+        """
+        某日期各状态的条目数
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT state, COUNT(*) AS count FROM crawl_frontier WHERE date = ? GROUP BY state', (date,)
+            ).fetchall()
+        counts = {state: 0 for state in STATES}
+        counts.update({row['state']: row['count'] for row in rows})
+        return counts
+
+    def is_complete(self, date):
+        """
+        该日期的所有条目是否都已写入数据库
+        """
+        counts = self.progress(date)
+        total = sum(counts.values())
+        return total > 0 and counts['stored'] == total
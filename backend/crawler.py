@@ -1,277 +1,397 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import logging
-import time
-import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from http_transport import HTTPTransport
+from http_cache import HTTPCache
+from page_parser import get_parser
+from url_dedup import CrawlSession
+from retry_scheduler import RetryPolicy, get_retry_scheduler
+from stream_parser import parse_article_stream
+from date_parser import parse_published_at, utc_now
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def is_permanent_error(e):
+    """
+    是否为重试无法恢复的错误：429 以外的 4xx 响应（如历史日期索引 404）
+    """
+    response = getattr(e, 'response', None)
+    status = getattr(response, 'status_code', None)
+    return isinstance(e, requests.exceptions.HTTPError) and status is not None and 400 <= status < 500 and status != 429
+
 class DetikCrawler:
-    def __init__(self):
+    def __init__(self, transport=None, http_cache=None, parser=None, retry_scheduler=None):
+        """
+        初始化爬虫
+        :param transport: 共享的 HTTPTransport，默认新建一个 keep-alive 连接池
+        :param http_cache: 条件请求缓存 HTTPCache，默认按 CRAWLER_CACHE_DIR 创建（为空则禁用）
+        :param parser: HTML 解析后端，默认按 CRAWLER_PARSER 选择
+        :param retry_scheduler: 重试调度器 RetryScheduler，失败请求排队重试而不阻塞 sleep，默认使用进程内共享实例
+        """
         self.base_url = "https://www.detik.com"
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
-        self.last_crawled_index = 0
-        self.crawled_urls = set()
-        self.retry_count = 0
+        self.transport = transport or HTTPTransport(headers=self.headers)
+        self.parser = parser or get_parser()
+        self.http_cache = http_cache
+        if self.http_cache is None:
+            cache_dir = os.getenv('CRAWLER_CACHE_DIR', 'http_cache')
+            if cache_dir:
+                max_bytes = int(os.getenv('CRAWLER_CACHE_MAX_MB', 200)) * 1024 * 1024
+                try:
+                    self.http_cache = HTTPCache(cache_dir, max_bytes)
+                except OSError as e:
+                    # 工作目录不可写（如只读的 serverless 环境）时不使用缓存
+                    logger.warning(f"HTTP cache disabled: {e}")
+        # 每个操作独立计数重试次数，带抖动的指数退避，总耗时（含单次请求超时）不超过 retry_deadline 秒
         self.max_retries = 3
-        self.retry_delay = 5
+        self.retry_delay = 1
+        self.retry_deadline = float(os.getenv('CRAWLER_RETRY_DEADLINE', 20))
+        self.retry_policy = RetryPolicy(self.max_retries, self.retry_delay)
+        self.retry_scheduler = retry_scheduler or get_retry_scheduler()
+        # 索引页分页：最多抓取页数，以及并行抓取的页数
+        self.max_index_pages = int(os.getenv('CRAWLER_MAX_INDEX_PAGES', 50))
+        self.page_workers = int(os.getenv('CRAWLER_PAGE_WORKERS', 5))
+        # 日期索引不存在（404）时是否回退到主页抓取最新新闻；回填历史日期时应关闭，避免把当天新闻记到历史日期下
+        self.fallback_to_homepage = True
+        # 流式抓取文章：正文结束后停止读取响应体
+        self.stream_articles = os.getenv('CRAWLER_STREAM_ARTICLES', 'true').lower() in ('1', 'true', 'yes')
 
-    def get_news_list(self, date):
+    def index_url(self, date, page=1):
         """
-        获取指定日期的新闻列表
+        获取指定日期的索引页 URL
         :param date: 日期字符串，格式为 YYYY-MM-DD
-        :return: 新闻列表，每个元素包含标题、URL、发布时间、封面图URL
+        :param page: 页码，从 1 开始
+        """
+        url = f"{self.base_url}/news/indeks/{date.replace('-', '/')}"
+        if page > 1:
+            url += f"?page={page}"
+        return url
+    
+    def parse_page_count(self, content):
+        """
+        从索引页的分页链接中解析总页数
+        :param content: 页面 HTML
+        :return: 页数，至少为 1
+        """
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='ignore')
+        pages = [int(page) for page in re.findall(r'[?&]page=(\d+)', content)]
+        return max(pages + [1])
+    
+    def get_all_news_list(self, date, session=None):
+        """
+        获取指定日期所有分页的新闻列表
+        第一页确定总页数，其余页按批并行抓取，按页码顺序合并；
+        某一页没有任何新 URL 时提前停止
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param session: 去重作用域 CrawlSession，默认新建（只在本次抓取内去重）
+        :return: 新闻列表
+        """
+        return self.crawl_index(date, session)[0]
+    
+    def crawl_index(self, date, session=None):
+        """
+        获取指定日期所有分页的新闻列表，并报告索引是否完整抓取
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param session: 去重作用域 CrawlSession，默认新建
+        :return: (新闻列表, 是否完整)；有分页失败或回退到主页时不完整，调用方应稍后重新抓取
+        """
+        return self._crawl_index_pages(date, session or CrawlSession())
+    
+    def _crawl_index_pages(self, date, session):
+        """
+        按分页抓取索引页，所有分页共享同一个去重作用域
+        :return: (新闻列表, 是否完整)
         """
         try:
-            # 尝试使用指定的日期URL
-            url = f"{self.base_url}/news/indeks/{date.replace('-', '/')}"
-            logger.info(f"Crawling news from: {url}")
+            url = self.index_url(date)
+            logger.info(f"Crawling paginated news from: {url}")
+            response = self.transport.get(url, timeout=60)
             
-            # 增加超时时间到60秒
-            response = requests.get(url, headers=self.headers, timeout=60)
-            
-            # 如果指定日期的URL返回404，则使用主页获取最新新闻
+            # 日期索引不存在时与 get_news_list 一样回退到主页（已拿到 404 响应，不再重复请求索引页）
             if response.status_code == 404:
+                if not self.fallback_to_homepage:
+                    logger.warning(f"Date {date} not found")
+                    return [], False
                 logger.warning(f"Date {date} not found, falling back to main page")
-                url = f"{self.base_url}/"
-                logger.info(f"Crawling news from: {url}")
-                response = requests.get(url, headers=self.headers, timeout=60)
+                return self._fetch_homepage_news(session), False
             
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            news_items = []
-            
-            # 查找新闻卡片 - 尝试多种选择器
-            news_cards = soup.find_all('article', class_='list-content__item')
-            if not news_cards:
-                news_cards = soup.find_all('div', class_='list-content__item')
-            if not news_cards:
-                news_cards = soup.find_all('article')
-            
-            logger.info(f"Found {len(news_cards)} news items")
-            
-            for card in news_cards:
-                try:
-                    # 标题和链接 - 尝试多种选择器
-                    title_elem = card.find('h3', class_='media__title')
-                    if not title_elem:
-                        title_elem = card.find('h3')
-                    if not title_elem:
-                        title_elem = card.find('h2')
-                    
-                    if not title_elem:
-                        logger.warning("No title element found, skipping card")
-                        continue
-                    
-                    title = title_elem.text.strip()
-                    
-                    link_elem = title_elem.find('a')
-                    if not link_elem:
-                        link_elem = card.find('a')
-                    
-                    if not link_elem:
-                        logger.warning("No link element found, skipping card")
-                        continue
-                    
-                    news_url = link_elem.get('href')
-                    if not news_url:
-                        logger.warning("No URL found, skipping card")
-                        continue
-                    
-                    if not news_url.startswith('http'):
-                        news_url = self.base_url + news_url
-                    
-                    # 数据去重检查
-                    if news_url in self.crawled_urls:
-                        logger.info(f"Skipping duplicate URL: {news_url}")
+            page_count = min(self.parse_page_count(response.content), self.max_index_pages)
+            news_items = self.parse_news_list(response.content, session)
+            logger.info(f"Index for {date} has {page_count} pages")
+        except Exception as e:
+            logger.error(f"Error crawling first index page: {e}")
+            return self.get_news_list(date, session), False
+        
+        failed_pages = []
+        with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+            for batch_start in range(2, page_count + 1, self.page_workers):
+                pages = range(batch_start, min(batch_start + self.page_workers, page_count + 1))
+                # executor.map 按提交顺序返回结果，保证按页码合并
+                for page, content in zip(pages, executor.map(lambda page: self._fetch_index_page(date, page), pages)):
+                    if content is None:
+                        failed_pages.append(page)
                         continue
-                    
-                    self.crawled_urls.add(news_url)
-                    
-                    # 发布时间
-                    time_elem = card.find('span', class_='media__date')
-                    if not time_elem:
-                        time_elem = card.find('span', class_='date')
-                    
-                    if not time_elem:
-                        published_at = datetime.now().isoformat()
-                    else:
-                        published_at = time_elem.text.strip()
-                    
-                    # 封面图
-                    image_elem = card.find('img', class_='media__image')
-                    if not image_elem:
-                        image_elem = card.find('img')
-                    
-                    image_url = image_elem.get('src') if image_elem else None
-                    
-                    news_items.append({
-                        'title': title,
-                        'url': news_url,
-                        'published_at': published_at,
-                        'image_url': image_url
-                    })
-                    
-                    # 更新断点续爬位置
-                    self.last_crawled_index += 1
-                    
-                    # 每爬取50条新闻，保存一次断点
-                    if self.last_crawled_index % 50 == 0:
-                        self.save_checkpoint(date, self.last_crawled_index)
-                        
-                except Exception as e:
-                    logger.error(f"Error parsing news card: {e}")
-                    continue
-            
-            logger.info(f"Successfully parsed {len(news_items)} news items")
-            return news_items
-            
+                    page_items = self.parse_news_list(content, session)
+                    if not page_items:
+                        logger.info(f"Page {page} has no new URLs, stopping pagination")
+                        return news_items, not failed_pages
+                    news_items.extend(page_items)
+        
+        if failed_pages:
+            logger.warning(f"Index for {date} incomplete, failed pages: {failed_pages}")
+        logger.info(f"Successfully parsed {len(news_items)} news items across {page_count} pages")
+        return news_items, not failed_pages
+    
+    def _fetch_index_page(self, date, page):
+        """
+        抓取单个索引分页
+        :return: 页面 HTML，失败时返回 None
+        """
+        try:
+            response = self.transport.get(self.index_url(date, page), timeout=60)
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            logger.error(f"Error crawling index page {page} for {date}: {e}")
+            return None
+    
+    def _fetch_homepage_news(self, session):
+        """
+        抓取主页的最新新闻（日期索引不存在时的回退）
+        :return: 新闻列表，失败时返回空列表
+        """
+        url = f"{self.base_url}/"
+        try:
+            logger.info(f"Crawling news from: {url}")
+            response = self.transport.get(url, timeout=60)
+            response.raise_for_status()
+            return self.parse_news_list(response.content, session)
+        except Exception as e:
+            logger.error(f"Error crawling main page: {e}")
+            return []
+    
+    def get_news_list(self, date, session=None):
+        """
+        获取指定日期的新闻列表
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :param session: 去重作用域 CrawlSession，默认新建（同一日期重复请求返回完整列表）
+        :return: 新闻列表，每个元素包含标题、URL、发布时间、封面图URL
+        """
+        try:
+            return self.retry_scheduler.call(
+                f"news list {date}", self._fetch_news_list, date, session,
+                policy=self.retry_policy,
+                deadline=self.retry_deadline,
+                retry_on=(requests.exceptions.RequestException,),
+                give_up=is_permanent_error,
+                pass_deadline=True
+            )
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout crawling news list (60s limit reached)")
-            return self._retry_with_backoff(date)
+            logger.error(f"Timeout crawling news list")
+            return []
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error crawling news list: {e}")
-            return self._retry_with_backoff(date)
+            return []
         except Exception as e:
             logger.error(f"Error crawling news list: {e}")
             return []
     
-    def _retry_with_backoff(self, date):
+    def _fetch_news_list(self, date, session, deadline=None):
         """
-        使用指数退避策略重试
+        抓取并解析索引页（单次尝试，请求异常向上抛出由调度器重试）
+        :param deadline: 整体截止前的剩余秒数，单次请求超时不超过该值
         """
-        if self.retry_count >= self.max_retries:
-            logger.error(f"Max retries ({self.max_retries}) reached, giving up")
-            return []
+        timeout = max(1, min(60, deadline)) if deadline is not None else 60
+        # 尝试使用指定的日期URL
+        url = self.index_url(date)
+        logger.info(f"Crawling news from: {url}")
+        
+        # 超时时间最多60秒
+        response, cached = self._conditional_get(url, timeout=timeout)
+        
+        # 如果指定日期的URL返回404，则使用主页获取最新新闻
+        if response.status_code == 404 and self.fallback_to_homepage:
+            logger.warning(f"Date {date} not found, falling back to main page")
+            url = f"{self.base_url}/"
+            logger.info(f"Crawling news from: {url}")
+            response, cached = self._conditional_get(url, timeout=timeout)
         
-        self.retry_count += 1
-        delay = self.retry_delay * (2 ** (self.retry_count - 1))
-        logger.info(f"Retrying in {delay} seconds... (attempt {self.retry_count}/{self.max_retries})")
-        time.sleep(delay)
-        return self.get_news_list(date)
+        # 页面未修改，直接使用缓存的解析结果
+        if response.status_code == 304 and cached:
+            self.http_cache.mark_hit(url)
+            logger.info(f"Index not modified, using {len(cached['parsed'])} cached news items")
+            return cached['parsed']
+        
+        response.raise_for_status()
+        
+        news_items = self.parse_news_list(response.content, session or CrawlSession())
+        if self.http_cache:
+            self.http_cache.put(url, response, news_items)
+        logger.info(f"Successfully parsed {len(news_items)} news items")
+        return news_items
     
-    def save_checkpoint(self, date, index):
+    def _conditional_get(self, url, timeout, stream=False):
         """
-        保存断点续爬位置
+        带条件请求头的 GET：缓存中有 ETag/Last-Modified 时发送 If-None-Match/If-Modified-Since
+        :return: (response, 缓存条目或 None)
         """
-        checkpoint_file = 'crawler_checkpoint.json'
-        try:
-            with open(checkpoint_file, 'w') as f:
-                json.dump({
-                    'date': date,
-                    'last_index': index,
-                    'timestamp': datetime.now().isoformat()
-                }, f)
-            logger.info(f"Checkpoint saved: {date}, index: {index}")
-        except Exception as e:
-            logger.error(f"Error saving checkpoint: {e}")
+        cached = self.http_cache.get(url) if self.http_cache else None
+        if cached and cached.get('parsed') is None:
+            cached = None
+        headers = self.http_cache.conditional_headers(cached) if cached else None
+        response = self.transport.get(url, headers=headers, timeout=timeout, stream=stream)
+        return response, cached
     
-    def load_checkpoint(self, date):
+    def parse_news_list(self, content, session=None):
         """
-        加载断点续爬位置
+        解析新闻索引页
+        :param content: 页面 HTML
+        :param session: 去重作用域 CrawlSession，默认只在本页内去重
+        :return: 新闻列表
         """
-        checkpoint_file = 'crawler_checkpoint.json'
-        try:
-            if os.path.exists(checkpoint_file):
-                with open(checkpoint_file, 'r') as f:
-                    checkpoint = json.load(f)
-                    if checkpoint.get('date') == date:
-                        self.last_crawled_index = checkpoint.get('last_index', 0)
-                        logger.info(f"Checkpoint loaded: {date}, index: {self.last_crawled_index}")
-        except Exception as e:
-            logger.error(f"Error loading checkpoint: {e}")
+        session = session or CrawlSession()
+        news_items = []
+        
+        cards = self.parser.parse_cards(content)
+        logger.info(f"Found {len(cards)} news items")
+        
+        for card in cards:
+            try:
+                title = card['title']
+                if title is None:
+                    logger.warning("No title element found, skipping card")
+                    continue
+                
+                news_url = card['url']
+                if not news_url:
+                    logger.warning("No URL found, skipping card")
+                    continue
+                
+                if not news_url.startswith('http'):
+                    news_url = self.base_url + news_url
+                
+                # 数据去重检查
+                if not session.is_new(news_url):
+                    logger.info(f"Skipping duplicate URL: {news_url}")
+                    continue
+                
+                session.add(news_url)
+                
+                news_items.append({
+                    'title': title,
+                    'url': news_url,
+                    'published_at': parse_published_at(card['published_at']) or utc_now(),
+                    'image_url': card['image_url']
+                })
+                
+            except Exception as e:
+                logger.error(f"Error parsing news card: {e}")
+                continue
+        
+        return news_items
     
-    def get_article_detail(self, url):
+    def get_article_detail(self, url, stream=None):
         """
         获取文章详情
         :param url: 文章 URL
+        :param stream: 是否流式读取并在正文结束后停止，默认使用 self.stream_articles
         :return: 文章详情，包含标题、发布时间、正文内容、图片列表
         """
+        if stream is None:
+            stream = self.stream_articles
         try:
-            logger.info(f"Crawling article detail from: {url}")
-            
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 标题
-            title_elem = soup.find('h1', class_='detail__title')
-            title = title_elem.text.strip() if title_elem else ''
-            
-            # 发布时间
-            time_elem = soup.find('div', class_='detail__date')
-            published_at = time_elem.text.strip() if time_elem else datetime.now().isoformat()
-            
-            # 正文内容
-            content_elem = soup.find('div', class_='detail__body')
-            paragraphs = []
-            images = []
-            
-            if content_elem:
-                # 提取段落
-                p_elems = content_elem.find_all('p')
-                for p in p_elems:
-                    text = p.text.strip()
-                    if text:
-                        paragraphs.append(text)
-                
-                # 提取图片
-                img_elems = content_elem.find_all('img')
-                for img in img_elems:
-                    img_url = img.get('src')
-                    if img_url:
-                        images.append(img_url)
-            
-            return {
-                'title': title,
-                'published_at': published_at,
-                'content': '\n'.join(paragraphs),
-                'paragraphs': paragraphs,
-                'images': images
-            }
-            
+            return self.retry_scheduler.call(
+                f"article {url}", self._fetch_article_detail, url, stream,
+                policy=self.retry_policy,
+                deadline=self.retry_deadline,
+                retry_on=(requests.exceptions.RequestException,),
+                give_up=is_permanent_error,
+                pass_deadline=True
+            )
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout crawling article detail (30s limit reached)")
-            return self._retry_article_with_backoff(url)
+            logger.error(f"Timeout crawling article detail")
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error crawling article detail: {e}")
-            return self._retry_article_with_backoff(url)
         except Exception as e:
             logger.error(f"Error crawling article detail: {e}")
-            return {
-                'title': '',
-                'published_at': datetime.now().isoformat(),
-                'content': '',
-                'paragraphs': [],
-                'images': []
-            }
+        return self._empty_article()
     
-    def _retry_article_with_backoff(self, url):
-        """
-        使用指数退避策略重试文章详情
-        """
-        if self.retry_count >= self.max_retries:
-            logger.error(f"Max retries ({self.max_retries}) reached for article, giving up")
-            return {
-                'title': '',
-                'published_at': datetime.now().isoformat(),
-                'content': '',
-                'paragraphs': [],
-                'images': []
-            }
+    def _fetch_article_detail(self, url, stream=False, deadline=None):
+        """
+        抓取并解析文章详情（单次尝试，请求异常向上抛出由调度器重试）
+        :param deadline: 整体截止前的剩余秒数，单次请求超时不超过该值
+        """
+        logger.info(f"Crawling article detail from: {url}")
+        
+        timeout = max(1, min(30, deadline)) if deadline is not None else 30
+        response, cached = self._conditional_get(url, timeout=timeout, stream=stream)
+        
+        # 文章未修改，跳过解析
+        if response.status_code == 304 and cached:
+            response.close()
+            self.http_cache.mark_hit(url)
+            return cached['parsed']
+        
+        response.raise_for_status()
+        
+        if stream:
+            # 边读边解析，正文结束后关闭连接，不再下载页脚等内容
+            # 未声明 charset 时 requests 默认 ISO-8859-1，detik 页面实际为 UTF-8
+            has_charset = 'charset' in response.headers.get('Content-Type', '').lower()
+            encoding = response.encoding if has_charset else 'utf-8'
+            try:
+                article, body = parse_article_stream(response.iter_content(chunk_size=16384), encoding)
+            finally:
+                response.close()
+            article_detail = self._article_result(article)
+        else:
+            body = response.content
+            article_detail = self.parse_article_detail(body)
         
-        self.retry_count += 1
-        delay = self.retry_delay * (2 ** (self.retry_count - 1))
-        logger.info(f"Retrying article in {delay} seconds... (attempt {self.retry_count}/{self.max_retries})")
-        time.sleep(delay)
-        return self.get_article_detail(url)
+        if self.http_cache:
+            self.http_cache.put(url, response, article_detail, body=body)
+        return article_detail
+    
+    def _empty_article(self):
+        """
+        抓取失败时返回的空文章
+        """
+        return {
+            'title': '',
+            'published_at': utc_now(),
+            'content': '',
+            'paragraphs': [],
+            'images': []
+        }
+    
+    def parse_article_detail(self, content):
+        """
+        解析文章详情页
+        :param content: 页面 HTML
+        :return: 文章详情，包含标题、发布时间、正文内容、图片列表
+        """
+        return self._article_result(self.parser.parse_article(content))
+    
+    def _article_result(self, article):
+        """
+        将解析后端的输出整理为文章详情字典
+        """
+        return {
+            'title': article['title'],
+            'published_at': parse_published_at(article['published_at']) or utc_now(),
+            'content': '\n'.join(article['paragraphs']),
+            'paragraphs': article['paragraphs'],
+            'images': article['images']
+        }
     
     def crawl_yesterday_news(self):
         """
@@ -281,10 +401,7 @@ class DetikCrawler:
         yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
         logger.info(f"Crawling news for yesterday: {yesterday}")
         
-        # 加载断点
-        self.load_checkpoint(yesterday)
-        
-        return self.get_news_list(yesterday)
+        return self.get_all_news_list(yesterday)
 
 if __name__ == "__main__":
     crawler = DetikCrawler()
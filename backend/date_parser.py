@@ -0,0 +1,96 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+# 数据库中 published_at 统一使用的 UTC ISO 格式，字符串顺序即时间顺序，可直接按范围走索引
+ISO_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# detik 使用印尼时区缩写
+TIMEZONE_OFFSETS = {'WIB': 7, 'WITA': 8, 'WIT': 9}
+# detik 的索引日期按 WIB 划分
+DEFAULT_OFFSET = TIMEZONE_OFFSETS['WIB']
+
+MONTHS = {
+    'jan': 1, 'januari': 1,
+    'feb': 2, 'februari': 2,
+    'mar': 3, 'maret': 3,
+    'apr': 4, 'april': 4,
+    'mei': 5, 'may': 5,
+    'jun': 6, 'juni': 6,
+    'jul': 7, 'juli': 7,
+    'agu': 8, 'agt': 8, 'ags': 8, 'agustus': 8, 'aug': 8,
+    'sep': 9, 'sept': 9, 'september': 9,
+    'okt': 10, 'oktober': 10, 'oct': 10,
+    'nov': 11, 'november': 11, 'nop': 11, 'nopember': 11,
+    'des': 12, 'desember': 12, 'dec': 12
+}
+
+RELATIVE_UNITS = {'detik': 'seconds', 'menit': 'minutes', 'jam': 'hours', 'hari': 'days', 'minggu': 'weeks'}
+
+# 例如 "Senin, 13 Okt 2025 10:00 WIB"、"13 Oktober 2025 10:00:30 WITA"
+ABSOLUTE_PATTERN = re.compile(
+    r'(\d{1,2})\s+([A-Za-z]+)\.?\s+(\d{4})(?:\D+(\d{1,2})[:.](\d{2})(?:[:.](\d{2}))?)?\s*(WIB|WITA|WIT)?',
+    re.IGNORECASE
+)
+# 例如 "5 menit yang lalu"
+RELATIVE_PATTERN = re.compile(r'(\d+)\s+(detik|menit|jam|hari|minggu)\s+(?:yang\s+)?lalu', re.IGNORECASE)
+
+def format_utc(dt):
+    """
+    转换为 UTC ISO 字符串（无时区的 datetime 视为 UTC）
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc)
+    return dt.strftime(ISO_FORMAT)
+
+def utc_now():
+    """
+    当前时间的 UTC ISO 字符串
+    """
+    return format_utc(datetime.now(timezone.utc))
+
+def parse_published_at(text, now=None):
+    """
+    解析 detik 的发布时间为 UTC ISO 字符串
+    支持印尼语日期（含 WIB/WITA/WIT 时区，缺省按 WIB）、"x menit yang lalu" 等相对时间和 ISO 时间
+    :param text: 原始发布时间文本
+    :param now: 解析相对时间的参考时间（aware datetime），默认为当前时间
+    :return: 形如 2025-10-13T03:00:00Z 的字符串，无法解析时返回 None
+    """
+    if not text:
+        return None
+    text = text.strip()
+
+    match = ABSOLUTE_PATTERN.search(text)
+    if match:
+        day, month_name, year, hour, minute, second, tz_name = match.groups()
+        month = MONTHS.get(month_name.lower())
+        if month:
+            offset = TIMEZONE_OFFSETS.get((tz_name or '').upper(), DEFAULT_OFFSET)
+            try:
+                local = datetime(int(year), month, int(day), int(hour or 0), int(minute or 0), int(second or 0),
+                                 tzinfo=timezone(timedelta(hours=offset)))
+            except ValueError:
+                return None
+            return format_utc(local)
+
+    match = RELATIVE_PATTERN.search(text)
+    if match:
+        amount, unit = match.groups()
+        now = now or datetime.now(timezone.utc)
+        return format_utc(now - timedelta(**{RELATIVE_UNITS[unit.lower()]: int(amount)}))
+
+    # 已经是 ISO 时间（包括旧数据中的 datetime.now().isoformat()，无时区时视为 UTC）
+    try:
+        return format_utc(datetime.fromisoformat(text.replace('Z', '+00:00')))
+    except ValueError:
+        return None
+
+def wib_day_range(date):
+    """
+    detik 索引日期（WIB 自然日）对应的 UTC 时间范围
+    :param date: 日期字符串，格式为 YYYY-MM-DD
+    :return: (起始, 结束) UTC ISO 字符串，均包含
+    """
+    start = datetime.strptime(date, '%Y-%m-%d') - timedelta(hours=DEFAULT_OFFSET)
+    end = start + timedelta(days=1, seconds=-1)
+    return start.strftime(ISO_FORMAT), end.strftime(ISO_FORMAT)
@@ -1,7 +1,15 @@
 import os
+import hashlib
 from openai import OpenAI
 import logging
 from dotenv import load_dotenv
+from rate_limiter import get_rate_limiter, is_rate_limited
+from llm_executor import LLMExecutor
+from circuit_breaker import CircuitBreaker
+from translation_cache import TranslationCache
+from llm_batching import BatchedLLMMixin
+from paragraph_packer import output_tokens
+from word_analysis import lemma, WordAnalysisCache
 
 # 加载环境变量
 load_dotenv()
@@ -9,7 +17,10 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class DeepSeekClient:
+class DeepSeekClient(BatchedLLMMixin):
+    chat_model = "deepseek-chat"
+    provider = 'DeepSeek'
+    
     def __init__(self):
         """
         初始化 DeepSeek 客户端
@@ -26,12 +37,55 @@ class DeepSeekClient:
                 base_url="https://api.deepseek.com/v1"
             )
             
+            # 按 API Key 限速（RATE_LIMITS 中可用 deepseek=N 配置）
+            self.rate_limiter = get_rate_limiter()
+            self.rate_key = f"deepseek:{hashlib.sha256(self.api_key.encode()).hexdigest()[:8]}"
+            
+            # 并发请求执行器（LLM_MAX_IN_FLIGHT 控制同时进行的请求数）
+            self.executor = LLMExecutor()
+            
+            # 熔断器：配额耗尽或持续限流时在冷却期内直接回退到缓存或原文，不再逐条等待失败
+            self.circuit_breaker = CircuitBreaker('deepseek')
+            
+            # 翻译缓存：相同原文不再重复调用 API，初始化失败时不使用缓存
+            self.model = self.chat_model
+            self.translation_cache = None
+            try:
+                self.translation_cache = TranslationCache(self.model)
+            except Exception as e:
+                logger.warning(f"Translation cache disabled: {e}")
+            
+            # 单词分析缓存：常见单词直接返回，初始化失败时不使用缓存
+            self.word_cache = None
+            try:
+                self.word_cache = WordAnalysisCache(self.model)
+            except Exception as e:
+                logger.warning(f"Word analysis cache disabled: {e}")
+            
             logger.info("DeepSeek client initialized successfully")
             
         except Exception as e:
             logger.error(f"Error initializing DeepSeek client: {e}")
             raise
     
+    def _chat(self, **kwargs):
+        """
+        发送对话补全请求，请求前领取令牌，429 时降低该 API Key 的速率
+        熔断器打开时直接抛出 CircuitOpenError
+        """
+        self.circuit_breaker.before_call()
+        self.rate_limiter.acquire(self.rate_key)
+        try:
+            response = self.client.chat.completions.create(**kwargs)
+        except Exception as e:
+            if is_rate_limited(e):
+                self.rate_limiter.report(self.rate_key, 429)
+            self.circuit_breaker.record_failure(e)
+            raise
+        self.rate_limiter.report(self.rate_key, 200)
+        self.circuit_breaker.record_success()
+        return response
+    
     def translate(self, text, target_language='zh-CN'):
         """
         翻译文本
@@ -43,19 +97,26 @@ class DeepSeekClient:
             if not text:
                 return text
             
+            if self.translation_cache:
+                cached = self.translation_cache.get(text, target_language)
+                if cached is not None:
+                    return cached
+            
             prompt = f"请将以下文本翻译成{target_language}，保持原意准确，语言自然流畅：\n\n{text}"
             
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
+            response = self._chat(
+                model=self.chat_model,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
-                max_tokens=256,
+                max_tokens=output_tokens([text]),
                 timeout=30.0
             )
             
             translated_text = response.choices[0].message.content.strip()
+            if self.translation_cache:
+                self.translation_cache.put(text, target_language, translated_text)
             
             logger.info(f"Translated text: {text[:50]}... -> {translated_text[:50]}...")
             return translated_text
@@ -75,93 +136,6 @@ class DeepSeekClient:
                 logger.error(f"Error translating text: {e}")
                 return text  # 其他错误时返回原文
     
-    def translate_news(self, news_list):
-        """
-        翻译新闻列表
-        :param news_list: 新闻列表
-        :return: 翻译后的新闻列表
-        """
-        try:
-            translated_news_list = []
-            quota_exceeded = False
-            
-            for news in news_list:
-                try:
-                    if news.get('title'):
-                        # 翻译标题
-                        translated_title = self.translate(news['title'])
-                        news['title_cn'] = translated_title
-                    else:
-                        # 如果没有标题，设置空字符串
-                        news['title_cn'] = ''
-                    translated_news_list.append(news)
-                except Exception as e:
-                    logger.error(f"Error translating news: {e}")
-                    # 检查是否是配额问题
-                    if '429' in str(e) or 'quota' in str(e).lower():
-                        quota_exceeded = True
-                    # 翻译失败时，仍然使用原标题
-                    news['title_cn'] = news.get('title', '')
-                    translated_news_list.append(news)
-            
-            # 如果配额用完，记录警告
-            if quota_exceeded:
-                logger.warning("DeepSeek API quota exceeded, using original text instead")
-            
-            return translated_news_list
-            
-        except Exception as e:
-            logger.error(f"Error translating news list: {e}")
-            # 整体翻译失败时，确保每个新闻都有title_cn字段
-            for news in news_list:
-                if 'title_cn' not in news:
-                    news['title_cn'] = news.get('title', '')
-            return news_list
-    
-    def translate_article(self, article_detail):
-        """
-        翻译文章详情
-        :param article_detail: 文章详情
-        :return: 翻译后的文章详情
-        """
-        try:
-            quota_exceeded = False
-            
-            if article_detail.get('title'):
-                # 翻译标题
-                try:
-                    translated_title = self.translate(article_detail['title'])
-                    article_detail['title_cn'] = translated_title
-                except Exception as e:
-                    logger.error(f"Error translating title: {e}")
-                    if '429' in str(e) or 'quota' in str(e).lower():
-                        quota_exceeded = True
-                    article_detail['title_cn'] = article_detail.get('title', '')
-            
-            if article_detail.get('paragraphs'):
-                # 翻译段落
-                translated_paragraphs = []
-                for paragraph in article_detail['paragraphs']:
-                    try:
-                        translated_paragraph = self.translate(paragraph)
-                        translated_paragraphs.append(translated_paragraph)
-                    except Exception as e:
-                        logger.error(f"Error translating paragraph: {e}")
-                        if '429' in str(e) or 'quota' in str(e).lower():
-                            quota_exceeded = True
-                        translated_paragraphs.append(paragraph)  # 翻译失败时使用原文
-                article_detail['paragraphs_cn'] = translated_paragraphs
-            
-            # 如果配额用完，记录警告
-            if quota_exceeded:
-                logger.warning("DeepSeek API quota exceeded during article translation, using original text instead")
-            
-            return article_detail
-            
-        except Exception as e:
-            logger.error(f"Error translating article: {e}")
-            return article_detail
-    
     def analyze_word(self, word, context=None):
         """
         分析单词
@@ -173,6 +147,11 @@ class DeepSeekClient:
             if not word:
                 return None
             
+            if self.word_cache:
+                cached = self.word_cache.get(word, context)
+                if cached is not None:
+                    return cached
+            
             prompt = f"请分析以下印尼语单词：{word}\n"
             
             if context:
@@ -185,8 +164,8 @@ class DeepSeekClient:
             prompt += "4. 用法说明（语感、使用场景等）\n"
             prompt += "5. 例句（如果有上下文请使用原句）\n"
             
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
+            response = self._chat(
+                model=self.chat_model,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
@@ -219,6 +198,12 @@ class DeepSeekClient:
                 elif '例句' in line:
                     analysis_result['context_sentence_id'] = line.split('：', 1)[1].strip() if '：' in line else line.strip()
             
+            # 模型未给出词根时使用本地词干提取结果
+            analysis_result['root_word'] = analysis_result['root_word'] or lemma(word)
+            
+            if self.word_cache and analysis_result['meaning_cn']:
+                self.word_cache.put_many([(word, context, analysis_result)])
+            
             logger.info(f"Analyzed word: {word}")
             return analysis_result
             
@@ -238,8 +223,8 @@ class DeepSeekClient:
             
             prompt = f"请为以下内容生成简洁的中文摘要，长度控制在100字以内：\n\n{content}"
             
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
+            response = self._chat(
+                model=self.chat_model,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
@@ -0,0 +1,227 @@
+import os
+import csv
+import json
+import mmap
+import struct
+import sqlite3
+import argparse
+import threading
+import logging
+from functools import lru_cache
+
+from word_analysis import normalize_word
+from stemmer import stem_word
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 词典文件格式：
+#   MAGIC(8) | 词条数 n(uint32) | 偏移表 (n + 1) * uint32 | 记录区
+#   每条记录为 "规范化单词\t紧凑 JSON"，按单词的 UTF-8 字节序排序
+MAGIC = b'IDZHDIC1'
+HEADER = struct.Struct('<8sI')
+OFFSET = struct.Struct('<I')
+DICTIONARY_FIELDS = ('meaning_cn', 'root_word', 'pos', 'vibe_check')
+
+def build_dictionary(entries, path):
+    """
+    生成只读词典文件（先写临时文件再替换，运行中的进程不会读到半个文件）
+    :param entries: (单词, 词条信息) 可迭代对象，同一单词以先出现的为准
+    :param path: 输出文件路径
+    :return: 词条数
+    """
+    lexicon = {}
+    for word, info in entries:
+        key = normalize_word(word)
+        if not key or '\t' in key or key in lexicon or not info.get('meaning_cn'):
+            continue
+        lexicon[key] = {field: info[field] for field in DICTIONARY_FIELDS if info.get(field)}
+
+    records = [
+        key.encode('utf-8') + b'\t' + json.dumps(lexicon[key], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        for key in sorted(lexicon, key=lambda k: k.encode('utf-8'))
+    ]
+    base = HEADER.size + OFFSET.size * (len(records) + 1)
+    offsets = [base]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(records)))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        for record in records:
+            f.write(record)
+    os.replace(tmp_path, path)
+    return len(records)
+
+class Dictionary:
+    def __init__(self, path):
+        """
+        只读印尼语-中文词典：文件通过 mmap 映射，查询时只触及二分查找经过的页面
+        :param path: build_dictionary 生成的词典文件
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} 不是有效的词典文件")
+        self.hits = 0
+        self.misses = 0
+        # 词干提取以本词典为词根表，结果按单词缓存
+        self.stem = lru_cache(maxsize=50000)(lambda key: stem_word(key, is_root=self.__contains__))
+
+    def __len__(self):
+        return self.count
+
+    def _record(self, i):
+        start, = OFFSET.unpack_from(self._mm, HEADER.size + OFFSET.size * i)
+        end, = OFFSET.unpack_from(self._mm, HEADER.size + OFFSET.size * (i + 1))
+        return start, end, self._mm.find(b'\t', start, end)
+
+    def _find(self, key):
+        """
+        二分查找规范化后的单词
+        :return: 词条信息字典，未收录时返回 None
+        """
+        key = key.encode('utf-8')
+        lo, hi = 0, self.count
+        while key and lo < hi:
+            mid = (lo + hi) // 2
+            start, end, tab = self._record(mid)
+            current = self._mm[start:tab]
+            if current == key:
+                return json.loads(self._mm[tab + 1:end])
+            if current < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def lookup(self, word):
+        """
+        查询单词，原形未收录时按词根查询；词条没有词根时用词干提取结果补全
+        按词根查到的是词根的释义（pelajaran 查到 ajar），结果带 lemma_match 标记，调用方应优先交给模型分析
+        :return: 词条信息字典，未收录时返回 None
+        """
+        key = normalize_word(word)
+        entry = self._find(key)
+        if entry is None:
+            root = self.stem(key)
+            entry = self._find(root) if root != key else None
+            if entry is not None:
+                entry['lemma_match'] = True
+                entry['root_word'] = root
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if not entry.get('root_word'):
+            entry['root_word'] = self.stem(key)
+        return entry
+
+    def __contains__(self, word):
+        """
+        单词原形是否收录（不做词干提取，供词干提取器用作词根表）
+        """
+        return self._find(normalize_word(word)) is not None
+
+    def stats(self):
+        return {
+            'entries': self.count,
+            'file_size': self._mm.size(),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+def vocabulary_entries(db_path):
+    """
+    从 vocabulary 表读取词条，同一单词以最近更新的为准
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute('''
+            SELECT word_selected, meaning_cn, root_word, pos, vibe_check FROM vocabulary
+            WHERE meaning_cn IS NOT NULL AND meaning_cn != ''
+            ORDER BY updated_at DESC, id DESC
+        ''').fetchall()
+    finally:
+        conn.close()
+    for word, meaning_cn, root_word, pos, vibe_check in rows:
+        yield word, {'meaning_cn': meaning_cn, 'root_word': root_word, 'pos': pos, 'vibe_check': vibe_check}
+
+def wordlist_entries(path):
+    """
+    读取词表文件：每行 "单词<TAB>中文释义[<TAB>词性[<TAB>词根]]"，# 开头的行为注释
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        for row in csv.reader(f, delimiter='\t'):
+            if not row or row[0].startswith('#') or len(row) < 2:
+                continue
+            yield row[0], {
+                'meaning_cn': row[1].strip(),
+                'pos': row[2].strip() if len(row) > 2 else '',
+                'root_word': row[3].strip() if len(row) > 3 else ''
+            }
+
+_shared_dictionary = None
+_shared_lock = threading.Lock()
+_shared_loaded = False
+
+def get_dictionary():
+    """
+    获取进程内共享的词典（DICTIONARY_PATH），文件不存在或无效时返回 None
+    """
+    global _shared_dictionary, _shared_loaded
+    if not _shared_loaded:
+        with _shared_lock:
+            if not _shared_loaded:
+                path = os.getenv('DICTIONARY_PATH', 'dictionary.bin')
+                try:
+                    if os.path.exists(path):
+                        _shared_dictionary = Dictionary(path)
+                        logger.info(f"Loaded dictionary {path} with {len(_shared_dictionary)} entries")
+                except Exception as e:
+                    logger.warning(f"Dictionary disabled: {e}")
+                _shared_loaded = True
+    return _shared_dictionary
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the memory-mapped Indonesian-Chinese dictionary')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='build the dictionary file')
+    build_parser.add_argument('--db', default='news_data.db', help='SQLite database with the vocabulary table')
+    build_parser.add_argument('--wordlist', action='append', default=[], help='tab-separated word list (repeatable, lower priority than vocabulary)')
+    build_parser.add_argument('--out', default=os.getenv('DICTIONARY_PATH', 'dictionary.bin'), help='output file')
+
+    lookup_parser = subparsers.add_parser('lookup', help='look up words')
+    lookup_parser.add_argument('words', nargs='+')
+    lookup_parser.add_argument('--dict', default=os.getenv('DICTIONARY_PATH', 'dictionary.bin'), help='dictionary file')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        def entries():
+            if os.path.exists(args.db):
+                yield from vocabulary_entries(args.db)
+            else:
+                logger.warning(f"Database {args.db} not found, building from word lists only")
+            for path in args.wordlist:
+                yield from wordlist_entries(path)
+
+        count = build_dictionary(entries(), args.out)
+        print(f"Wrote {count} entries to {args.out} ({os.path.getsize(args.out)} bytes)")
+    else:
+        dictionary = Dictionary(args.dict)
+        for word in args.words:
+            print(word, json.dumps(dictionary.lookup(word), ensure_ascii=False))
+        dictionary.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import os
+import hashlib
+from types import SimpleNamespace
 import google.generativeai as genai
 import logging
 from dotenv import load_dotenv
+from rate_limiter import get_rate_limiter, is_rate_limited
+from llm_executor import LLMExecutor
+from circuit_breaker import CircuitBreaker
+from llm_batching import BatchedLLMMixin
+from paragraph_packer import output_tokens
+from word_analysis import lemma
 
 # 加载环境变量
 load_dotenv()
@@ -9,7 +17,10 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class GeminiClient:
+class GeminiClient(BatchedLLMMixin):
+    chat_model = 'gemini-2.5-flash'
+    provider = 'Gemini'
+    
     def __init__(self):
         """
         初始化 Gemini 客户端
@@ -26,11 +37,57 @@ class GeminiClient:
             # 初始化模型
             self.model = genai.GenerativeModel('gemini-2.5-flash')
             
+            # 按 API Key 限速（RATE_LIMITS 中可用 gemini=N 配置）
+            self.rate_limiter = get_rate_limiter()
+            self.rate_key = f"gemini:{hashlib.sha256(self.api_key.encode()).hexdigest()[:8]}"
+            
+            # 并发请求执行器（LLM_MAX_IN_FLIGHT 控制同时进行的请求数）
+            self.executor = LLMExecutor()
+            
+            # 熔断器：配额耗尽或持续限流时在冷却期内直接回退到缓存或原文，不再逐条等待失败
+            self.circuit_breaker = CircuitBreaker('gemini')
+            
+            # 与 DeepSeekClient 接口一致（Gemini 客户端不使用缓存）
+            self.translation_cache = None
+            self.word_cache = None
+            
             logger.info("Gemini client initialized successfully")
             
         except Exception as e:
             logger.error(f"Error initializing Gemini client: {e}")
             raise
+    def _generate(self, *args, **kwargs):
+        """
+        调用 generate_content，请求前领取令牌，429 时降低该 API Key 的速率
+        熔断器打开时直接抛出 CircuitOpenError
+        """
+        self.circuit_breaker.before_call()
+        self.rate_limiter.acquire(self.rate_key)
+        try:
+            response = self.model.generate_content(*args, **kwargs)
+        except Exception as e:
+            if is_rate_limited(e):
+                self.rate_limiter.report(self.rate_key, 429)
+            self.circuit_breaker.record_failure(e)
+            raise
+        self.rate_limiter.report(self.rate_key, 200)
+        self.circuit_breaker.record_success()
+        return response
+    def _chat(self, messages, max_tokens=None, temperature=None, timeout=None, **kwargs):
+        """
+        OpenAI 风格的对话补全接口（供 LLMRouter 在服务商之间切换），返回与 openai 响应结构相同的对象
+        """
+        import google.generativeai.types as types
+        generation_config = types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+        )
+        response = self._generate(
+            '\n\n'.join(message['content'] for message in messages),
+            generation_config=generation_config,
+            request_options={"timeout": timeout} if timeout else None
+        )
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=response.text))])
     def translate(self, text, target_language='zh-CN'):
         """
         翻译文本
@@ -49,10 +106,10 @@ class GeminiClient:
             generation_config = types.GenerationConfig(
                 temperature=0.7,
                 top_p=0.9,
-                max_output_tokens=256,
+                max_output_tokens=output_tokens([text]),
             )
             
-            response = self.model.generate_content(
+            response = self._generate(
                 prompt,
                 generation_config=generation_config,
                 request_options={"timeout": 30}  # 30秒超时
@@ -72,91 +129,6 @@ class GeminiClient:
             else:
                 logger.error(f"Error translating text: {e}")
                 return text  # 其他错误时返回原文
-    def translate_news(self, news_list):
-        """
-        翻译新闻列表
-        :param news_list: 新闻列表
-        :return: 翻译后的新闻列表
-        """
-        try:
-            translated_news_list = []
-            quota_exceeded = False
-            
-            for news in news_list:
-                try:
-                    if news.get('title'):
-                        # 翻译标题
-                        translated_title = self.translate(news['title'])
-                        news['title_cn'] = translated_title
-                    else:
-                        # 如果没有标题，设置空字符串
-                        news['title_cn'] = ''
-                    translated_news_list.append(news)
-                except Exception as e:
-                    logger.error(f"Error translating news: {e}")
-                    # 检查是否是配额问题
-                    if '429' in str(e) or 'quota' in str(e).lower():
-                        quota_exceeded = True
-                    # 翻译失败时，仍然使用原标题
-                    news['title_cn'] = news.get('title', '')
-                    translated_news_list.append(news)
-            
-            # 如果配额用完，记录警告
-            if quota_exceeded:
-                logger.warning("Gemini API quota exceeded, using original text instead")
-            
-            return translated_news_list
-            
-        except Exception as e:
-            logger.error(f"Error translating news list: {e}")
-            # 整体翻译失败时，确保每个新闻都有title_cn字段
-            for news in news_list:
-                if 'title_cn' not in news:
-                    news['title_cn'] = news.get('title', '')
-            return news_list
-    def translate_article(self, article_detail):
-        """
-        翻译文章详情
-        :param article_detail: 文章详情
-        :return: 翻译后的文章详情
-        """
-        try:
-            quota_exceeded = False
-            
-            if article_detail.get('title'):
-                # 翻译标题
-                try:
-                    translated_title = self.translate(article_detail['title'])
-                    article_detail['title_cn'] = translated_title
-                except Exception as e:
-                    logger.error(f"Error translating title: {e}")
-                    if '429' in str(e) or 'quota' in str(e).lower():
-                        quota_exceeded = True
-                    article_detail['title_cn'] = article_detail.get('title', '')
-            
-            if article_detail.get('paragraphs'):
-                # 翻译段落
-                translated_paragraphs = []
-                for paragraph in article_detail['paragraphs']:
-                    try:
-                        translated_paragraph = self.translate(paragraph)
-                        translated_paragraphs.append(translated_paragraph)
-                    except Exception as e:
-                        logger.error(f"Error translating paragraph: {e}")
-                        if '429' in str(e) or 'quota' in str(e).lower():
-                            quota_exceeded = True
-                        translated_paragraphs.append(paragraph)  # 翻译失败时使用原文
-                article_detail['paragraphs_cn'] = translated_paragraphs
-            
-            # 如果配额用完，记录警告
-            if quota_exceeded:
-                logger.warning("Gemini API quota exceeded during article translation, using original text instead")
-            
-            return article_detail
-            
-        except Exception as e:
-            logger.error(f"Error translating article: {e}")
-            return article_detail
     def analyze_word(self, word, context=None):
         """
         分析单词
@@ -180,7 +152,7 @@ class GeminiClient:
             prompt += "4. 用法说明（语感、使用场景等）\n"
             prompt += "5. 例句（如果有上下文请使用原句）\n"
             
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             
             # 解析响应
             analysis_result = {
@@ -207,6 +179,9 @@ class GeminiClient:
                 elif '例句' in line:
                     analysis_result['context_sentence_id'] = line.split('：', 1)[1].strip() if '：' in line else line.strip()
             
+            # 模型未给出词根时使用本地词干提取结果
+            analysis_result['root_word'] = analysis_result['root_word'] or lemma(word)
+            
             logger.info(f"Analyzed word: {word}")
             return analysis_result
             
@@ -225,7 +200,7 @@ class GeminiClient:
             
             prompt = f"请为以下内容生成简洁的中文摘要，长度控制在100字以内：\n\n{content}"
             
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             summary = response.text.strip()
             
             logger.info(f"Generated summary: {summary[:100]}...")
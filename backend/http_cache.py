@@ -0,0 +1,179 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class HTTPCache:
+    def __init__(self, cache_dir='http_cache', max_bytes=200 * 1024 * 1024):
+        """
+        磁盘 HTTP 缓存：保存响应体、ETag/Last-Modified 以及解析结果，
+        再次请求时发送条件请求，304 时直接返回解析结果
+        :param cache_dir: 缓存目录
+        :param max_bytes: 缓存总大小上限，超出时按最近最少使用淘汰
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+        logger.info(f"HTTP cache initialized at {self.cache_dir} ({self._total_bytes} bytes)")
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def _entries(self):
+        """
+        遍历缓存条目
+        :return: (key, 字节数, 最近访问时间) 列表
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            key = name[:-5]
+            meta_path, body_path = self._paths(key)
+            try:
+                size = os.path.getsize(meta_path)
+                if os.path.exists(body_path):
+                    size += os.path.getsize(body_path)
+                entries.append((key, size, os.path.getmtime(meta_path)))
+            except OSError:
+                continue
+        return entries
+
+    def get(self, url):
+        """
+        读取缓存条目
+        :param url: 请求 URL
+        :return: 条目字典（etag、last_modified、parsed），不存在时返回 None
+        """
+        meta_path, _ = self._paths(self._key(url))
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_body(self, url):
+        """
+        读取缓存的响应体
+        """
+        _, body_path = self._paths(self._key(url))
+        try:
+            with open(body_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def conditional_headers(self, entry):
+        """
+        根据缓存条目生成条件请求头
+        """
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def mark_hit(self, url):
+        """
+        记录一次 304 命中，并刷新 LRU 访问时间
+        """
+        meta_path, _ = self._paths(self._key(url))
+        with self._lock:
+            self.hits += 1
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            pass
+
+    def put(self, url, response, parsed, body=None):
+        """
+        保存响应及其解析结果；没有 ETag/Last-Modified 的响应无法重新验证，不缓存
+        :param url: 请求 URL
+        :param response: requests.Response
+        :param parsed: 解析结果（需可 JSON 序列化）
+        :param body: 响应体，默认使用 response.content
+        """
+        with self._lock:
+            self.misses += 1
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        key = self._key(url)
+        meta_path, body_path = self._paths(key)
+        meta = json.dumps({
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'parsed': parsed
+        }, ensure_ascii=False).encode('utf-8')
+        if body is None:
+            body = response.content
+
+        try:
+            with self._lock:
+                self._total_bytes -= self._size_of(key)
+                with open(body_path, 'wb') as f:
+                    f.write(body)
+                with open(meta_path, 'wb') as f:
+                    f.write(meta)
+                self._total_bytes += len(meta) + len(body)
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except Exception as e:
+            logger.error(f"Error writing HTTP cache entry: {e}")
+
+    def _size_of(self, key):
+        size = 0
+        for path in self._paths(key):
+            if os.path.exists(path):
+                size += os.path.getsize(path)
+        return size
+
+    def _evict(self):
+        """
+        按最近访问时间淘汰条目，直到总大小降到上限的 90%
+        """
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for key, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._total_bytes <= target:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._total_bytes -= size
+            evicted += 1
+        logger.info(f"HTTP cache evicted {evicted} entries, now {self._total_bytes} bytes")
+
+    def stats(self):
+        """
+        缓存统计信息
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,127 @@
+import os
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import get_rate_limiter, parse_retry_after
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# HTTP/2 依赖 httpx[http2]，未安装时自动回退到 requests 连接池
+try:
+    import httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+class HTTPTransport:
+    def __init__(self, pool_connections=None, pool_maxsize=None, http2=None, headers=None, limiter=None):
+        """
+        初始化共享 HTTP 连接池（keep-alive，线程安全）
+        :param pool_connections: 缓存的主机连接池数量
+        :param pool_maxsize: 每个主机的最大连接数（超出时阻塞等待，而不是新建连接）
+        :param http2: 是否启用 HTTP/2（需要安装 httpx[http2]）
+        :param headers: 默认请求头
+        :param limiter: 请求限速器（提供 acquire(url) / report(url, status, retry_after)），默认使用共享的按主机令牌桶
+        """
+        self.pool_connections = pool_connections or int(os.getenv('CRAWLER_POOL_CONNECTIONS', 10))
+        self.pool_maxsize = pool_maxsize or int(os.getenv('CRAWLER_POOL_MAXSIZE', 10))
+        if http2 is None:
+            http2 = os.getenv('CRAWLER_HTTP2', '').lower() in ('1', 'true', 'yes')
+        self.headers = headers or {}
+        self.limiter = limiter if limiter is not None else get_rate_limiter()
+        self._lock = threading.Lock()
+        self._session = None
+        self._client = None
+
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("HTTP/2 requested but httpx is not installed, falling back to HTTP/1.1 pool")
+            http2 = False
+        self.http2 = http2
+
+    def _get_session(self):
+        """
+        懒加载 requests.Session，所有线程共享同一个连接池
+        """
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=True
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update(self.headers)
+                    self._session = session
+                    logger.info(f"HTTP pool created: {self.pool_connections} hosts x {self.pool_maxsize} connections")
+        return self._session
+
+    def _get_client(self):
+        """
+        懒加载 httpx.Client（HTTP/2）
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    limits = httpx.Limits(
+                        max_connections=self.pool_connections * self.pool_maxsize,
+                        max_keepalive_connections=self.pool_maxsize
+                    )
+                    self._client = httpx.Client(http2=True, limits=limits, headers=self.headers, follow_redirects=True)
+                    logger.info("HTTP/2 client created")
+        return self._client
+
+    def get(self, url, headers=None, timeout=30, stream=False):
+        """
+        发送 GET 请求，复用连接池中的连接
+        :param url: 请求 URL
+        :param headers: 额外请求头
+        :param timeout: 超时时间（秒）
+        :param stream: 是否流式读取响应体
+        :return: requests.Response
+        """
+        self.limiter.acquire(url)
+        if self.http2 and not stream:
+            response = self._get_http2(url, headers, timeout)
+        else:
+            response = self._get_session().get(url, headers=headers, timeout=timeout, stream=stream)
+        # 429 时按主机降速，成功时逐步恢复
+        self.limiter.report(url, response.status_code, parse_retry_after(response.headers.get('Retry-After')))
+        return response
+
+    def _get_http2(self, url, headers, timeout):
+        """
+        通过 httpx 发送请求，并转换为 requests.Response，保证调用方的异常处理不变
+        """
+        try:
+            resp = self._get_client().get(url, headers=headers, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e))
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e))
+
+        response = requests.Response()
+        response.status_code = resp.status_code
+        response.headers.update(resp.headers)
+        response._content = resp.content
+        response.url = str(resp.url)
+        response.encoding = resp.encoding
+        response.reason = resp.reason_phrase
+        return response
+
+    def close(self):
+        """
+        关闭连接池
+        """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._client is not None:
+                self._client.close()
+                self._client = None
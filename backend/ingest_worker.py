@@ -0,0 +1,190 @@
+import argparse
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+from crawler import DetikCrawler
+from crawl_frontier import CrawlFrontier
+from article_prefetch import ArticlePrefetcher
+from sqlite_db import SQLiteDBManager
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def news_to_row(news):
+    """
+    将爬虫输出的新闻条目转换为 news_feed 表的行数据
+    """
+    return {
+        'original_url': news.get('url', ''),
+        'title_id': news.get('title', ''),
+        'title_cn': news.get('title_cn', ''),
+        'thumbnail_r2_url': news.get('image_url', ''),
+        'published_at': news.get('published_at', ''),
+        'is_crawled': False
+    }
+
+def is_translated(news):
+    """
+    标题是否真正翻译过（翻译失败时 title_cn 回退为原标题）
+    """
+    return bool(news.get('title_cn')) and news.get('title_cn') != news.get('title')
+
+def translate_titles(translator, news_list):
+    """
+    翻译新闻标题，失败或未配置翻译客户端时使用原标题
+    :param translator: 翻译客户端，可为 None
+    :param news_list: 新闻列表
+    :return: 带 title_cn 的新闻列表
+    """
+    if translator:
+        try:
+            news_list = translator.translate_news(news_list)
+        except Exception as e:
+            logger.error(f"Error translating news list: {e}")
+    for news in news_list:
+        if not news.get('title_cn'):
+            news['title_cn'] = news.get('title', '')
+    return news_list
+
+class IngestionWorker:
+    def __init__(self, crawler=None, translator=None, db_manager=None, frontier=None, prefetcher=None):
+        """
+        后台采集：抓取新闻列表、翻译标题、批量写入数据库，
+        让 /api/news 在热路径上只读数据库
+        每一步的进度记录在抓取边界中，重启后从中断处继续
+        :param crawler: DetikCrawler 实例
+        :param translator: 翻译客户端（DeepSeekClient 等），为 None 时使用原标题
+        :param db_manager: SQLiteDBManager 实例
+        :param frontier: CrawlFrontier 实例
+        :param prefetcher: ArticlePrefetcher 实例，入库后预取前 N 篇文章正文
+        """
+        self.crawler = crawler or DetikCrawler()
+        self.translator = translator
+        self.db_manager = db_manager or SQLiteDBManager()
+        self.frontier = frontier or CrawlFrontier()
+        self.prefetcher = prefetcher
+
+    def translate(self, news_list):
+        """
+        翻译新闻标题，失败时使用原标题
+        """
+        return translate_titles(self.translator, news_list)
+
+    def ingest_date(self, date):
+        """
+        采集指定日期的所有新闻：发现 -> 翻译 -> 入库
+        已入库或已翻译的条目不会重复处理；过去日期的索引完整抓取后不再重新抓取
+        翻译失败的条目先以原标题入库，保持未翻译状态，下次采集时重试翻译
+        :param date: 日期字符串，格式为 YYYY-MM-DD
+        :return: 本次写入的新闻数量（含以原标题写入的条目）
+        """
+        start = time.monotonic()
+        today = datetime.now().strftime('%Y-%m-%d')
+        if date >= today or not self.frontier.is_indexed(date):
+            news_list, complete = self.crawler.crawl_index(date)
+            self.frontier.discover(date, news_list)
+            if complete:
+                self.frontier.mark_indexed(date)
+        else:
+            logger.info(f"Index for {date} already discovered, resuming from frontier")
+
+        # 翻译尚未翻译的条目，只推进真正翻译成功的条目
+        untranslated = []
+        pending = self.frontier.items(date, before_state='translated')
+        if pending:
+            pending = self.translate(pending)
+            self.frontier.advance_many([(news['url'], news) for news in pending if is_translated(news)], 'translated')
+            untranslated = [news for news in pending if not is_translated(news)]
+            if untranslated:
+                logger.warning(f"{len(untranslated)} titles for {date} not translated, will retry next pass")
+
+        # 写入已翻译但尚未入库的条目；未翻译的条目以原标题写入，状态不变
+        ready = self.frontier.items(date, state='translated')
+        rows = ready + untranslated
+        if rows:
+            result = self.db_manager.insert_news_batch([news_to_row(news) for news in rows])
+            if result:
+                self.frontier.advance_many([(news['url'], None) for news in ready], 'stored')
+                if self.prefetcher:
+                    self.prefetcher.schedule(rows)
+            else:
+                for news in rows:
+                    self.frontier.record_failure(news['url'], 'insert_news_batch failed')
+
+        logger.info(f"Ingested {len(rows)} news items for {date} in {time.monotonic() - start:.1f}s "
+                    f"(progress: {self.frontier.progress(date)})")
+        return len(rows)
+
+    def run_once(self):
+        """
+        采集昨天和今天的新闻
+        """
+        today = datetime.now()
+        total = 0
+        for day in (today - timedelta(days=1), today):
+            try:
+                total += self.ingest_date(day.strftime('%Y-%m-%d'))
+            except Exception as e:
+                logger.error(f"Error ingesting {day.strftime('%Y-%m-%d')}: {e}")
+        return total
+
+    def run_forever(self, interval):
+        """
+        按固定间隔循环采集
+        :param interval: 采集间隔（秒）
+        """
+        logger.info(f"Ingestion worker started, interval {interval}s")
+        while True:
+            started = time.monotonic()
+            self.run_once()
+            time.sleep(max(0, interval - (time.monotonic() - started)))
+
+def create_translator():
+    """
+    初始化 LLM 客户端（DeepSeek / Gemini，两者都配置时使用 LLMRouter），失败时返回 None（使用原标题）
+    """
+    try:
+        from llm_router import create_llm_client
+        return create_llm_client()
+    except Exception as e:
+        logger.warning(f"Translation disabled: {e}")
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Background news ingestion worker')
+    parser.add_argument('--once', action='store_true', help='run a single ingestion pass and exit')
+    parser.add_argument('--date', help='ingest a single date (YYYY-MM-DD) and exit')
+    parser.add_argument('--interval', type=int, default=900, help='seconds between passes')
+    parser.add_argument('--db', default='news_data.db', help='SQLite database path')
+    parser.add_argument('--state-db', help='crawler state database (frontier), defaults to CRAWLER_STATE_DB')
+    parser.add_argument('--no-prefetch', action='store_true', help='do not prefetch article bodies after ingesting')
+    args = parser.parse_args()
+
+    crawler = DetikCrawler()
+    translator = create_translator()
+    db_manager = SQLiteDBManager(args.db)
+    prefetcher = None
+    if not args.no_prefetch:
+        prefetch_translate = os.getenv('ARTICLE_PREFETCH_TRANSLATE', 'false').lower() in ('1', 'true', 'yes')
+        prefetcher = ArticlePrefetcher(crawler, db_manager, translator=translator if prefetch_translate else None)
+
+    worker = IngestionWorker(
+        crawler=crawler,
+        translator=translator,
+        db_manager=db_manager,
+        frontier=CrawlFrontier(args.state_db),
+        prefetcher=prefetcher
+    )
+    if args.date:
+        worker.ingest_date(args.date)
+    elif args.once:
+        worker.run_once()
+    else:
+        worker.run_forever(args.interval)
+    if prefetcher:
+        prefetcher.shutdown()
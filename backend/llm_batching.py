@@ -0,0 +1,261 @@
+import threading
+import logging
+
+from rate_limiter import is_rate_limited
+from batch_translation import split_by_budget, build_batch_prompt, batch_max_tokens, parse_batch_response
+from paragraph_packer import pack_paragraphs, output_tokens, build_packed_prompt, split_packed_response
+from word_analysis import normalize_word, context_key, ANALYSIS_BATCH_SIZE, build_analysis_prompt, analysis_max_tokens, parse_analysis_response
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class BatchedLLMMixin:
+    """
+    批量翻译、段落打包翻译和批量单词分析的公共实现，DeepSeekClient 和 GeminiClient 共用
+    使用方需提供：
+      _chat(**kwargs)      OpenAI 风格的对话补全接口
+      translate(text, target_language)  单条翻译（批量结果无法解析时逐条回退）
+      executor             LLMExecutor
+      translation_cache    TranslationCache，可为 None
+      word_cache           WordAnalysisCache，可为 None
+      chat_model           请求使用的模型名称
+      provider             服务商名称，用于日志
+    """
+    chat_model = None
+    provider = 'LLM'
+
+    def translate_batch(self, texts, target_language='zh-CN'):
+        """
+        批量翻译：按 token 预算把多条文本打包进一次请求，输出 JSON 数组后按编号映射回原顺序
+        已缓存的文本不再请求；多个批次并发请求；某条结果无法解析时只对该条单独调用 translate，请求失败时该批使用原文
+        :param texts: 待翻译的文本列表
+        :param target_language: 目标语言，默认为中文
+        :return: 与输入等长的译文列表
+        """
+        results = list(texts)
+        indices = []
+        for i, text in enumerate(texts):
+            if not text:
+                continue
+            cached = self.translation_cache.get(text, target_language) if self.translation_cache else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                indices.append(i)
+        sources = [texts[i] for i in indices]
+
+        quota_exceeded = threading.Event()
+
+        def translate_one_batch(batch):
+            batch_texts = [sources[j] for j in batch]
+            if quota_exceeded.is_set():
+                return batch_texts
+            try:
+                response = self._chat(
+                    model=self.chat_model,
+                    messages=[
+                        {"role": "user", "content": build_batch_prompt(batch_texts, target_language)}
+                    ],
+                    temperature=0.3,
+                    max_tokens=batch_max_tokens(batch_texts),
+                    timeout=60.0
+                )
+                translated = parse_batch_response(response.choices[0].message.content, len(batch_texts))
+            except Exception as e:
+                if is_rate_limited(e) or 'quota' in str(e).lower():
+                    # 配额用完时后续批次同样会失败，其余批次直接使用原文
+                    logger.warning(f"{self.provider} API quota exceeded, using original text for remaining items: {e}")
+                    quota_exceeded.set()
+                else:
+                    logger.error(f"Error translating batch of {len(batch_texts)}: {e}")
+                return batch_texts
+
+            if self.translation_cache:
+                self.translation_cache.put_many(
+                    [(text, value) for text, value in zip(batch_texts, translated) if value is not None], target_language
+                )
+
+            missing = [k for k, value in enumerate(translated) if value is None]
+            if missing:
+                logger.warning(f"Batch translation returned {len(missing)}/{len(batch_texts)} unparsable items, retrying individually")
+            for k in missing:
+                try:
+                    translated[k] = self.translate(batch_texts[k], target_language)
+                except Exception as e:
+                    logger.error(f"Error translating item: {e}")
+                    translated[k] = batch_texts[k]
+            logger.info(f"Translated batch of {len(batch_texts)} texts")
+            return translated
+
+        # 各批次并发请求，结果按批次顺序写回
+        batches = split_by_budget(sources)
+        keep_original = lambda batch, error: [sources[j] for j in batch]
+        for batch, translated in zip(batches, self.executor.map(translate_one_batch, batches, fallback=keep_original)):
+            for k, j in enumerate(batch):
+                results[indices[j]] = translated[k]
+
+        return results
+
+    def translate_news(self, news_list):
+        """
+        翻译新闻列表（标题批量翻译，一次请求包含多条标题）
+        :param news_list: 新闻列表
+        :return: 翻译后的新闻列表
+        """
+        try:
+            titles = [news.get('title', '') for news in news_list]
+            for news, title_cn in zip(news_list, self.translate_batch(titles)):
+                news['title_cn'] = title_cn or news.get('title', '')
+            return news_list
+
+        except Exception as e:
+            logger.error(f"Error translating news list: {e}")
+            # 整体翻译失败时，确保每个新闻都有title_cn字段
+            for news in news_list:
+                if 'title_cn' not in news:
+                    news['title_cn'] = news.get('title', '')
+            return news_list
+
+    def _translate_packed(self, texts, target_language):
+        """
+        将相邻段落打包为一次请求翻译，按 [[编号]] 标记拆回各段；拆分失败的段落单独翻译
+        """
+        if len(texts) == 1:
+            return [self.translate(texts[0], target_language)]
+
+        response = self._chat(
+            model=self.chat_model,
+            messages=[
+                {"role": "user", "content": build_packed_prompt(texts, target_language)}
+            ],
+            temperature=0.7,
+            max_tokens=output_tokens(texts),
+            timeout=60.0
+        )
+        translated = split_packed_response(response.choices[0].message.content, len(texts))
+        if self.translation_cache:
+            self.translation_cache.put_many(
+                [(text, value) for text, value in zip(texts, translated) if value is not None], target_language
+            )
+
+        missing = [k for k, value in enumerate(translated) if value is None]
+        if missing:
+            logger.warning(f"Packed translation lost {len(missing)}/{len(texts)} paragraphs, retrying individually")
+        for k in missing:
+            translated[k] = self.translate(texts[k], target_language)
+        logger.info(f"Translated {len(texts)} paragraphs in one request")
+        return translated
+
+    def translate_iter(self, texts, target_language='zh-CN'):
+        """
+        翻译多段文本：已缓存的段落立即产出，其余相邻段落按 token 预算打包，各包并发请求，
+        每个包完成后立即产出其中各段（用于流式返回）
+        :param texts: 待翻译的文本列表
+        :param target_language: 目标语言，默认为中文
+        :return: 生成器，产出 (下标, 译文)，失败时译文为原文
+        """
+        pending = []
+        for i, text in enumerate(texts):
+            cached = self.translation_cache.get(text, target_language) if text and self.translation_cache else None
+            if not text or cached is not None:
+                yield i, cached if cached is not None else text
+            else:
+                pending.append(i)
+
+        chunks = pack_paragraphs([texts[i] for i in pending])
+
+        def translate_chunk(chunk):
+            return self._translate_packed([texts[pending[j]] for j in chunk], target_language)
+
+        def keep_original(chunk, error):
+            # 翻译失败时使用原文
+            if '429' in str(error) or 'quota' in str(error).lower():
+                logger.warning(f"{self.provider} API quota exceeded during translation, using original text instead")
+            return [texts[pending[j]] for j in chunk]
+
+        for c, translated in self.executor.iter_completed(translate_chunk, chunks, fallback=keep_original):
+            for j, text in zip(chunks[c], translated):
+                yield pending[j], text
+
+    def translate_article(self, article_detail):
+        """
+        翻译文章详情（标题和段落按 token 预算打包，各包并发请求）
+        :param article_detail: 文章详情
+        :return: 翻译后的文章详情
+        """
+        try:
+            title = article_detail.get('title')
+            paragraphs = article_detail.get('paragraphs') or []
+            texts = ([title] if title else []) + paragraphs
+            translated = list(texts)
+            for index, text in self.translate_iter(texts):
+                translated[index] = text
+
+            if title:
+                article_detail['title_cn'] = translated.pop(0)
+            if paragraphs:
+                article_detail['paragraphs_cn'] = translated
+
+            return article_detail
+
+        except Exception as e:
+            logger.error(f"Error translating article: {e}")
+            return article_detail
+
+    def analyze_words(self, items):
+        """
+        批量分析单词：先查缓存，未命中的单词按原形和上下文去重后合并为结构化批量请求（每批至多 ANALYSIS_BATCH_SIZE 个）
+        :param items: (单词, 上下文) 列表
+        :return: 与输入顺序一致的分析结果列表，失败的位置为 None
+        """
+        results = [None] * len(items)
+        pending = []
+        duplicates = {}
+        for i, (word, context) in enumerate(items):
+            if not word:
+                continue
+            cached = self.word_cache.get(word, context) if self.word_cache else None
+            if cached is not None:
+                results[i] = cached
+                continue
+            # 同一单词（大小写、标点不同）在同一上下文中只请求一次；同词根的不同派生词释义不同，分别请求
+            key = (normalize_word(word), context_key(context))
+            if key in duplicates:
+                duplicates[key].append(i)
+            else:
+                duplicates[key] = []
+                pending.append(i)
+
+        if not pending:
+            return results
+
+        batches = [pending[k:k + ANALYSIS_BATCH_SIZE] for k in range(0, len(pending), ANALYSIS_BATCH_SIZE)]
+
+        def analyze_batch(batch):
+            batch_items = [items[i] for i in batch]
+            response = self._chat(
+                model=self.chat_model,
+                messages=[
+                    {"role": "user", "content": build_analysis_prompt(batch_items)}
+                ],
+                temperature=0.3,
+                max_tokens=analysis_max_tokens(batch_items),
+                timeout=60.0
+            )
+            analyses = parse_analysis_response(response.choices[0].message.content, batch_items)
+            # 在发出请求的线程中写缓存（LLMRouter 按实际返回结果的服务商记录模型）
+            if self.word_cache:
+                self.word_cache.put_many([
+                    (word, context, analysis) for (word, context), analysis in zip(batch_items, analyses) if analysis
+                ])
+            return analyses
+
+        for batch, analyses in zip(batches, self.executor.map(analyze_batch, batches)):
+            for i, analysis in zip(batch, analyses or [None] * len(batch)):
+                results[i] = analysis
+                for j in duplicates[(normalize_word(items[i][0]), context_key(items[i][1]))]:
+                    results[j] = dict(analysis, word=items[j][0]) if analysis else None
+
+        found = sum(1 for i in pending if results[i] is not None)
+        logger.info(f"Analyzed {found}/{len(pending)} uncached words in {len(batches)} requests")
+        return results
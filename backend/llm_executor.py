@@ -0,0 +1,60 @@
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class LLMExecutor:
+    def __init__(self, max_in_flight=None):
+        """
+        LLM 并发请求执行器：多个请求并发发送，结果保持输入顺序，单条失败不影响其他条目
+        同一个客户端的所有调用共享一个并发上限
+        :param max_in_flight: 同时进行的最大请求数，默认读取 LLM_MAX_IN_FLIGHT
+        """
+        self.max_in_flight = max_in_flight or int(os.getenv('LLM_MAX_IN_FLIGHT', 8))
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+
+    def _call(self, func, item, fallback):
+        with self._slots:
+            try:
+                return func(item)
+            except Exception as e:
+                logger.error(f"LLM request failed: {e}")
+                if fallback is None:
+                    return None
+                return fallback(item, e)
+
+    def map(self, func, items, fallback=None):
+        """
+        并发执行 func(item)，按输入顺序返回结果
+        :param func: 单条请求函数
+        :param items: 输入列表
+        :param fallback: 失败时的回退函数 fallback(item, error)，默认结果为 None
+        :return: 结果列表
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [self._call(func, item, fallback) for item in items]
+
+        workers = min(len(items), self.max_in_flight)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='llm') as executor:
+            return list(executor.map(lambda item: self._call(func, item, fallback), items))
+
+    def iter_completed(self, func, items, fallback=None):
+        """
+        并发执行 func(item)，按完成顺序逐条产出结果
+        :return: 生成器，产出 (下标, 结果)
+        """
+        items = list(items)
+        if not items:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(len(items), self.max_in_flight), thread_name_prefix='llm')
+        try:
+            futures = {executor.submit(self._call, func, item, fallback): i for i, item in enumerate(items)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # 调用方提前停止（如客户端断开）时取消尚未开始的请求
+            executor.shutdown(wait=False, cancel_futures=True)
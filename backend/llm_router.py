@@ -0,0 +1,264 @@
+import os
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
+
+from deepseek_client import DeepSeekClient
+from llm_executor import LLMExecutor
+from rate_limiter import is_rate_limited
+from circuit_breaker import OPEN
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def is_timeout(error):
+    message = str(error).lower()
+    return isinstance(error, TimeoutError) or 'timeout' in message or 'timed out' in message
+
+class ProviderHealth:
+    def __init__(self, name, window=None, cooldown=None):
+        """
+        单个 LLM 服务商的滚动健康统计：最近 window 次请求的耗时和成败
+        429 或超时后冷却 cooldown 秒，冷却期间排在健康服务商之后
+        """
+        self.name = name
+        self.samples = deque(maxlen=window or int(os.getenv('LLM_ROUTER_WINDOW', 50)))
+        self.cooldown = cooldown or float(os.getenv('LLM_ROUTER_COOLDOWN', 30))
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency, error=None):
+        with self._lock:
+            self.samples.append((latency, error is None))
+            self.requests += 1
+            if error is not None:
+                self.failures += 1
+                if is_rate_limited(error) or is_timeout(error):
+                    self.cooldown_until = time.monotonic() + self.cooldown
+
+    def healthy(self):
+        return time.monotonic() >= self.cooldown_until
+
+    def error_rate(self):
+        with self._lock:
+            if not self.samples:
+                return 0.0
+            return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency(self, quantile=0.5):
+        """
+        成功请求耗时的分位数（秒），没有样本时返回 None
+        """
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(quantile * len(latencies)))]
+
+    def score(self):
+        """
+        排序分数，越小越优先：中位耗时按错误率加权；没有样本的服务商为 0（优先试探），
+        只有失败没有成功的服务商为无穷大（排在最后）
+        """
+        median = self.latency()
+        if median is None:
+            with self._lock:
+                return 0.0 if not self.samples else float('inf')
+        return median * (1 + 4 * self.error_rate())
+
+    def stats(self):
+        p50, p95 = self.latency(0.5), self.latency(0.95)
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate(), 3),
+            'p50_ms': round(p50 * 1000) if p50 is not None else None,
+            'p95_ms': round(p95 * 1000) if p95 is not None else None,
+            'cooling_down': not self.healthy()
+        }
+
+class RoutedCache:
+    def __init__(self, cache, models, served_model):
+        """
+        路由共用的缓存视图（TranslationCache 或 WordAnalysisCache）：
+        查询时按服务商顺序查找各模型的结果，写入时记在实际返回结果的服务商模型名下，
+        备用服务商的结果不会冒充首选服务商的结果
+        :param cache: 底层缓存
+        :param models: 各服务商的模型名称
+        :param served_model: 返回当前线程最近一次请求实际使用的模型名称的函数
+        """
+        self.cache = cache
+        self.models = models
+        self.served_model = served_model
+
+    def get(self, *args):
+        for model in self.models:
+            value = self.cache.get(*args, model=model)
+            if value is not None:
+                return value
+        return None
+
+    def put(self, *args):
+        self.cache.put(*args, model=self.served_model())
+
+    def put_many(self, *args):
+        self.cache.put_many(*args, model=self.served_model())
+
+    def stats(self):
+        return self.cache.stats()
+
+class LLMRouter(DeepSeekClient):
+    def __init__(self, providers, names=None, hedge=None):
+        """
+        LLM 服务商路由：接口与 DeepSeekClient 相同（翻译、分析等上层方法直接复用），
+        每次请求发给当前最快的健康服务商，失败时依次切换到下一个；
+        可选对冲：首选服务商超过其 p95 耗时仍未返回时，向下一个服务商再发一次，取先返回的结果
+        :param providers: 客户端列表（需实现 OpenAI 风格的 _chat），第一个客户端的翻译缓存和单词缓存供路由共用，
+                          结果按实际返回的服务商模型分别记录
+        :param names: 服务商名称列表，用于日志和统计
+        :param hedge: 是否启用对冲请求，默认读取 LLM_HEDGE_ENABLED
+        """
+        if not providers:
+            raise ValueError("LLMRouter 至少需要一个服务商")
+        self.providers = list(providers)
+        names = names or [type(provider).__name__.replace('Client', '').lower() for provider in self.providers]
+        self.health = [ProviderHealth(name) for name in names]
+        if hedge is None:
+            hedge = os.getenv('LLM_HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+        self.hedge = hedge
+        self.hedge_min_samples = int(os.getenv('LLM_HEDGE_MIN_SAMPLES', 20))
+        self.hedges = 0
+        self.failovers = 0
+
+        primary = self.providers[0]
+        self.model = getattr(primary, 'model', 'deepseek-chat')
+        self.models = [getattr(provider, 'chat_model', None) or name for provider, name in zip(self.providers, names)]
+        self._served = threading.local()
+        translation_cache = getattr(primary, 'translation_cache', None)
+        word_cache = getattr(primary, 'word_cache', None)
+        self.translation_cache = RoutedCache(translation_cache, self.models, self.served_model) if translation_cache else None
+        self.word_cache = RoutedCache(word_cache, self.models, self.served_model) if word_cache else None
+        self.executor = LLMExecutor()
+        # 对冲请求在独立线程中发出，不占用上层执行器的并发名额
+        self._hedge_pool = ThreadPoolExecutor(max_workers=self.executor.max_in_flight * 2, thread_name_prefix='llm-hedge')
+        logger.info(f"LLM router initialized with providers {names}, hedging {'on' if self.hedge else 'off'}")
+
+    def _ranked(self):
+        """
+        服务商排序：健康（未冷却且熔断器未打开）的在前，同组内按分数从小到大
+        """
+        def available(i):
+            breaker = getattr(self.providers[i], 'circuit_breaker', None)
+            return self.health[i].healthy() and (breaker is None or breaker.state != OPEN)
+        return sorted(range(len(self.providers)), key=lambda i: (not available(i), self.health[i].score()))
+
+    def served_model(self):
+        """
+        当前线程最近一次请求实际返回结果的服务商模型名称（缓存写入时使用），尚无请求时为首选服务商
+        """
+        return getattr(self._served, 'model', None) or self.models[0]
+
+    def _send(self, index, kwargs):
+        """
+        :return: (服务商下标, 响应)
+        """
+        started = time.monotonic()
+        try:
+            response = self.providers[index]._chat(**kwargs)
+        except Exception as e:
+            self.health[index].record(time.monotonic() - started, e)
+            raise
+        self.health[index].record(time.monotonic() - started)
+        return index, response
+
+    def _failover(self, order, kwargs):
+        last_error = None
+        for position, index in enumerate(order):
+            if position:
+                self.failovers += 1
+            try:
+                return self._send(index, kwargs)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"LLM provider {self.health[index].name} failed: {e}")
+        raise last_error
+
+    def _chat(self, **kwargs):
+        """
+        发送对话补全请求：按健康状况和耗时选择服务商，失败时切换，必要时对冲
+        实际返回结果的服务商记录在当前线程中，随后的缓存写入按其模型记录
+        """
+        index, response = self._route(kwargs)
+        self._served.model = self.models[index]
+        return response
+
+    def _route(self, kwargs):
+        """
+        :return: (服务商下标, 响应)
+        """
+        order = self._ranked()
+        delay = None
+        if self.hedge and len(order) > 1 and len(self.health[order[0]].samples) >= self.hedge_min_samples:
+            delay = self.health[order[0]].latency(0.95)
+        if delay is None:
+            return self._failover(order, kwargs)
+
+        first = self._hedge_pool.submit(self._send, order[0], kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            if first.exception() is None:
+                return first.result()
+            logger.warning(f"LLM provider {self.health[order[0]].name} failed: {first.exception()}")
+            self.failovers += 1
+            return self._failover(order[1:], kwargs)
+
+        # 首选服务商超过 p95 仍未返回，向其余服务商再发一次，取先成功的结果
+        self.hedges += 1
+        second = self._hedge_pool.submit(self._failover, order[1:], kwargs)
+        last_error = None
+        for future in as_completed([first, second]):
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+        raise last_error
+
+    def stats(self):
+        return {
+            'hedging': self.hedge,
+            'hedges': self.hedges,
+            'failovers': self.failovers,
+            'providers': {
+                health.name: dict(health.stats(), circuit=provider.circuit_breaker.stats() if getattr(provider, 'circuit_breaker', None) else None)
+                for health, provider in zip(self.health, self.providers)
+            }
+        }
+
+def create_llm_client():
+    """
+    按已配置的 API Key 创建 LLM 客户端：只有一个服务商时直接返回该客户端，
+    有多个服务商且 LLM_ROUTER_ENABLED 未关闭时返回 LLMRouter（DeepSeek 优先）
+    :return: 客户端，没有可用服务商时抛出异常
+    """
+    providers = []
+    errors = []
+    if os.getenv('DEEPSEEK_API_KEY'):
+        try:
+            providers.append(DeepSeekClient())
+        except Exception as e:
+            errors.append(e)
+    if os.getenv('GOOGLE_GEMINI_API_KEY'):
+        try:
+            from gemini_client import GeminiClient
+            providers.append(GeminiClient())
+        except Exception as e:
+            errors.append(e)
+
+    if not providers:
+        raise errors[0] if errors else ValueError("缺少 DEEPSEEK_API_KEY 或 GOOGLE_GEMINI_API_KEY 环境变量")
+    if len(providers) == 1 or os.getenv('LLM_ROUTER_ENABLED', 'true').lower() not in ('1', 'true', 'yes'):
+        return providers[0]
+    return LLMRouter(providers)
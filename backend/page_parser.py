@@ -0,0 +1,222 @@
+import os
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+from selector_cascade import SelectorCascade
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 可选解析后端：selectolax（最快）、lxml（BeautifulSoup 的 C 解析器）
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        # selectolax < 0.3.18 只有 Modest 后端
+        from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SelectolaxHTMLParser = None
+        SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# 选择器按优先级排列：(标签, class)，class 为 None 表示只按标签匹配
+CARD_SELECTORS = [('article', 'list-content__item'), ('div', 'list-content__item'), ('article', None)]
+TITLE_SELECTORS = [('h3', 'media__title'), ('h3', None), ('h2', None)]
+TIME_SELECTORS = [('span', 'media__date'), ('span', 'date')]
+IMAGE_SELECTORS = [('img', 'media__image'), ('img', None)]
+
+class ParserBackend:
+    """
+    解析后端基类：子类只需实现节点查找和取值的基本操作，
+    卡片/文章的字段提取逻辑在这里统一实现，保证各后端输出一致
+    """
+    name = 'base'
+    # 为 True 时每个卡片选择器各自构建一棵（受限的）树，否则整页只解析一次
+    per_selector_tree = False
+
+    def __init__(self):
+        self.cascade = SelectorCascade()
+
+    def _card_tree(self, content, selector):
+        raise NotImplementedError
+
+    def _article_tree(self, content):
+        raise NotImplementedError
+
+    def _find_all(self, node, tag, cls):
+        raise NotImplementedError
+
+    def _find(self, node, tag, cls):
+        raise NotImplementedError
+
+    def _text(self, node):
+        raise NotImplementedError
+
+    def _attr(self, node, name):
+        raise NotImplementedError
+
+    def _find_first(self, node, key, selectors):
+        """
+        通过选择器级联按优先级查找第一个匹配的节点
+        """
+        return self.cascade.first(key, selectors, lambda selector: self._find(node, *selector))
+
+    def parse_cards(self, content):
+        """
+        解析索引页新闻卡片
+        :param content: 页面 HTML
+        :return: 卡片列表，每个元素包含 title、url、published_at、image_url（缺失为 None）
+        """
+        trees = {}
+
+        def probe_cards(selector):
+            # 非受限后端整页只解析一次，受限后端按选择器构建子树
+            tree_key = selector if self.per_selector_tree else None
+            if tree_key not in trees:
+                trees[tree_key] = self._card_tree(content, selector)
+            return self._find_all(trees[tree_key], *selector) or None
+
+        cards = self.cascade.first(('index', 'card'), CARD_SELECTORS, probe_cards) or []
+
+        results = []
+        for card in cards:
+            title_elem = self._find_first(card, ('index', 'title'), TITLE_SELECTORS)
+            link_elem = None
+            if title_elem is not None:
+                link_elem = self._find(title_elem, 'a', None)
+                if link_elem is None:
+                    link_elem = self._find(card, 'a', None)
+            time_elem = self._find_first(card, ('index', 'time'), TIME_SELECTORS)
+            image_elem = self._find_first(card, ('index', 'image'), IMAGE_SELECTORS)
+
+            results.append({
+                'title': self._text(title_elem) if title_elem is not None else None,
+                'url': self._attr(link_elem, 'href') if link_elem is not None else None,
+                'published_at': self._text(time_elem) if time_elem is not None else None,
+                'image_url': self._attr(image_elem, 'src') if image_elem is not None else None
+            })
+        return results
+
+    def parse_article(self, content):
+        """
+        解析文章详情页
+        :param content: 页面 HTML
+        :return: 包含 title、published_at（缺失为 None）、paragraphs、images 的字典
+        """
+        tree = self._article_tree(content)
+        title_elem = self._find(tree, 'h1', 'detail__title')
+        time_elem = self._find(tree, 'div', 'detail__date')
+        content_elem = self._find(tree, 'div', 'detail__body')
+
+        paragraphs = []
+        images = []
+        if content_elem is not None:
+            for p in self._find_all(content_elem, 'p', None):
+                text = self._text(p)
+                if text:
+                    paragraphs.append(text)
+            for img in self._find_all(content_elem, 'img', None):
+                img_url = self._attr(img, 'src')
+                if img_url:
+                    images.append(img_url)
+
+        return {
+            'title': self._text(title_elem) if title_elem is not None else '',
+            'published_at': self._text(time_elem) if time_elem is not None else None,
+            'paragraphs': paragraphs,
+            'images': images
+        }
+
+class SoupBackend(ParserBackend):
+    def __init__(self, features=None, strain=True):
+        """
+        BeautifulSoup 后端
+        :param features: 底层解析器，默认有 lxml 时用 lxml，否则用 html.parser
+        :param strain: 是否用 SoupStrainer 只构建卡片/正文子树
+        """
+        super().__init__()
+        self.features = features or ('lxml' if LXML_AVAILABLE else 'html.parser')
+        self.strain = strain
+        self.per_selector_tree = strain
+        self.name = f"soup-{self.features}" + ('' if strain else '-full')
+
+    def _card_tree(self, content, selector):
+        if not self.strain:
+            return BeautifulSoup(content, self.features)
+        tag, cls = selector
+        strainer = SoupStrainer(tag, class_=cls) if cls else SoupStrainer(tag)
+        return BeautifulSoup(content, self.features, parse_only=strainer)
+
+    def _article_tree(self, content):
+        if not self.strain:
+            return BeautifulSoup(content, self.features)
+        strainer = SoupStrainer(class_=['detail__title', 'detail__date', 'detail__body'])
+        return BeautifulSoup(content, self.features, parse_only=strainer)
+
+    def _find_all(self, node, tag, cls):
+        return node.find_all(tag, class_=cls) if cls else node.find_all(tag)
+
+    def _find(self, node, tag, cls):
+        return node.find(tag, class_=cls) if cls else node.find(tag)
+
+    def _text(self, node):
+        return node.text.strip()
+
+    def _attr(self, node, name):
+        return node.get(name)
+
+class SelectolaxBackend(ParserBackend):
+    name = 'selectolax'
+
+    def __init__(self):
+        """
+        selectolax 后端（Lexbor C 解析器 + CSS 选择器）
+        """
+        if not SELECTOLAX_AVAILABLE:
+            raise ImportError("selectolax is not installed")
+        super().__init__()
+
+    def _card_tree(self, content, selector):
+        return SelectolaxHTMLParser(content)
+
+    def _article_tree(self, content):
+        return SelectolaxHTMLParser(content)
+
+    def _css(self, tag, cls):
+        return f"{tag}.{cls}" if cls else tag
+
+    def _find_all(self, node, tag, cls):
+        return node.css(self._css(tag, cls))
+
+    def _find(self, node, tag, cls):
+        return node.css_first(self._css(tag, cls))
+
+    def _text(self, node):
+        return node.text().strip()
+
+    def _attr(self, node, name):
+        return node.attributes.get(name)
+
+def get_parser(name=None):
+    """
+    获取解析后端
+    :param name: auto / selectolax / lxml / html.parser，默认读取 CRAWLER_PARSER 环境变量
+    :return: ParserBackend 实例
+    """
+    name = name or os.getenv('CRAWLER_PARSER', 'auto')
+    if name == 'selectolax' or (name == 'auto' and SELECTOLAX_AVAILABLE):
+        if SELECTOLAX_AVAILABLE:
+            return SelectolaxBackend()
+        logger.warning("selectolax is not installed, falling back to BeautifulSoup")
+    if name == 'lxml' and not LXML_AVAILABLE:
+        logger.warning("lxml is not installed, falling back to html.parser")
+        return SoupBackend('html.parser')
+    if name in ('lxml', 'html.parser'):
+        return SoupBackend(name)
+    return SoupBackend()
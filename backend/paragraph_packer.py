@@ -0,0 +1,52 @@
+import re
+
+from batch_translation import estimate_tokens, split_by_budget, MAX_OUTPUT_TOKENS
+
+# 单次请求打包的段落输入 token 预算
+PACK_INPUT_TOKENS = 1500
+# 单条文本请求的最小输出 token 数
+MIN_OUTPUT_TOKENS = 256
+
+MARKER_PATTERN = re.compile(r'^\s*\[\[(\d+)\]\]\s*$', re.MULTILINE)
+
+def pack_paragraphs(paragraphs, max_tokens=PACK_INPUT_TOKENS):
+    """
+    将相邻段落按 token 预算打包，超出预算的单个段落独占一个包
+    :return: 包列表，每个包为段落下标列表（保持原顺序）
+    """
+    return split_by_budget(paragraphs, max_tokens=max_tokens, max_items=len(paragraphs) or 1)
+
+def output_tokens(texts):
+    """
+    按输入长度估算译文所需的 max_tokens（中文译文 token 数通常不超过原文的 2 倍）
+    """
+    needed = sum(estimate_tokens(text) for text in texts) * 2 + 16 * len(texts) + 32
+    return max(MIN_OUTPUT_TOKENS, min(MAX_OUTPUT_TOKENS, needed))
+
+def build_packed_prompt(paragraphs, target_language='zh-CN'):
+    """
+    构造打包翻译提示词：每段前加 [[编号]] 标记行，要求译文保留标记
+    """
+    body = '\n'.join(f"[[{i + 1}]]\n{paragraph}" for i, paragraph in enumerate(paragraphs))
+    return (
+        f"请将以下印尼语文本翻译成{target_language}，保持原意准确，语言自然流畅。\n"
+        f"文本共 {len(paragraphs)} 段，每段前有一行 [[编号]] 标记。请原样保留每个标记行及其顺序，"
+        f"在标记下一行输出该段译文，不要合并或拆分段落，不要输出其他内容。\n\n{body}"
+    )
+
+def split_packed_response(content, expected):
+    """
+    按 [[编号]] 标记把译文拆回各段
+    :return: 长度为 expected 的列表，缺失的段为 None
+    """
+    results = [None] * expected
+    if not content:
+        return results
+    parts = MARKER_PATTERN.split(content.strip())
+    # parts = [标记前内容, 编号, 译文, 编号, 译文, ...]
+    for number, text in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        text = text.strip()
+        if 0 <= index < expected and text and results[index] is None:
+            results[index] = text
+    return results
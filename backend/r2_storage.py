@@ -5,6 +5,7 @@ from minio import Minio
 from minio.error import S3Error
 import logging
 from dotenv import load_dotenv
+from rate_limiter import get_rate_limiter, parse_retry_after
 
 # 加载环境变量
 load_dotenv()
@@ -35,6 +36,9 @@ class R2Storage:
                 secure=True
             )
             
+            # 图片下载按来源主机限速
+            self.rate_limiter = get_rate_limiter()
+            
             # 检查桶是否存在，不存在则创建
             if not self.client.bucket_exists(self.bucket_name):
                 self.client.make_bucket(self.bucket_name)
@@ -54,7 +58,9 @@ class R2Storage:
         try:
             logger.info(f"Downloading image from: {image_url}")
             
+            self.rate_limiter.acquire(image_url)
             response = requests.get(image_url, timeout=30)
+            self.rate_limiter.report(image_url, response.status_code, parse_retry_after(response.headers.get('Retry-After')))
             response.raise_for_status()
             
             return BytesIO(response.content)
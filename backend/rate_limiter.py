@@ -0,0 +1,194 @@
+import os
+import time
+import threading
+import logging
+from urllib.parse import urlparse
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None, min_rate=None):
+        """
+        令牌桶：按 rate 个/秒补充令牌，最多积攒 capacity 个（允许的突发量）
+        收到 429 时速率减半并暂停，之后每次成功逐步恢复到配置速率（AIMD）
+        :param rate: 配置的补充速率（请求/秒）
+        :param capacity: 桶容量，默认等于 rate（至少为 1）
+        :param min_rate: 自适应降速的下限，默认为 rate 的 1/16
+        """
+        self.base_rate = float(rate)
+        self.rate = self.base_rate
+        self.capacity = float(capacity or max(1.0, rate))
+        self.min_rate = float(min_rate or self.base_rate / 16)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """
+        取出令牌，不足时等待
+        :return: 等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = max(self.paused_until - now, (tokens - self.tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def on_success(self):
+        """
+        请求成功：加性恢复速率
+        """
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+    def on_throttled(self, retry_after=None):
+        """
+        收到 429：乘性降速，清空令牌并暂停到 Retry-After（默认一个新的补充间隔）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.paused_until = max(self.paused_until, now + (retry_after if retry_after else 1 / self.rate))
+            self.throttled += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate': round(self.rate, 3),
+                'base_rate': self.base_rate,
+                'tokens': round(self.tokens, 2),
+                'throttled': self.throttled
+            }
+
+class RateLimiter:
+    def __init__(self, default_rate=None, rates=None):
+        """
+        按主机或 API Key 分桶的限速器，所有出站客户端共享
+        :param default_rate: 未单独配置的键的速率（请求/秒），默认读取 RATE_LIMIT_DEFAULT
+        :param rates: {键: 速率}，默认解析 RATE_LIMITS（如 "www.detik.com=5,deepseek=3"）
+        """
+        self.default_rate = float(default_rate or os.getenv('RATE_LIMIT_DEFAULT', 5))
+        self.rates = rates if rates is not None else parse_rates(os.getenv('RATE_LIMITS', ''))
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def key_for(self, key):
+        """
+        URL 按主机名分桶，其他字符串原样作为键
+        """
+        if '://' in key:
+            return urlparse(key).hostname or key
+        return key
+
+    def bucket(self, key):
+        key = self.key_for(key)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    # 键本身或其前缀（如 deepseek:xxxx 对应 deepseek）可单独配置速率
+                    rate = self.rates.get(key, self.rates.get(key.split(':')[0], self.default_rate))
+                    bucket = self._buckets[key] = TokenBucket(rate)
+        return bucket
+
+    def acquire(self, key):
+        """
+        请求前调用，令牌不足时阻塞
+        :param key: URL 或限速键
+        """
+        waited = self.bucket(key).acquire()
+        if waited > 1:
+            logger.info(f"Rate limited {self.key_for(key)}: waited {waited:.1f}s")
+        return waited
+
+    def report(self, key, status_code, retry_after=None):
+        """
+        请求完成后调用，根据状态码调整速率
+        :param status_code: HTTP 状态码
+        :param retry_after: Retry-After 秒数（可选）
+        """
+        bucket = self.bucket(key)
+        if status_code == 429:
+            bucket.on_throttled(retry_after)
+            logger.warning(f"429 from {self.key_for(key)}, slowing down to {bucket.rate:.2f} req/s")
+        elif status_code < 500:
+            bucket.on_success()
+
+    def stats(self):
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {key: bucket.stats() for key, bucket in buckets.items()}
+
+class NullLimiter:
+    """
+    不限速的限速器（接口与 RateLimiter 相同），用于本地桩服务器基准测试等不需要礼貌间隔的场景
+    """
+    def acquire(self, key):
+        return 0.0
+
+    def report(self, key, status_code, retry_after=None):
+        pass
+
+    def stats(self):
+        return {}
+
+def parse_rates(spec):
+    """
+    解析 "key=rate,key=rate" 格式的速率配置
+    """
+    rates = {}
+    for item in spec.split(','):
+        if '=' in item:
+            key, rate = item.split('=', 1)
+            rates[key.strip()] = float(rate)
+    return rates
+
+def parse_retry_after(value):
+    """
+    解析 Retry-After 头（只支持秒数）
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+def is_rate_limited(error):
+    """
+    判断 SDK 抛出的异常是否为 429 限流
+    """
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    if status == 429:
+        return True
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'resource exhausted' in message
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter():
+    """
+    获取进程内共享的限速器
+    """
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RateLimiter()
+    return _shared_limiter
@@ -0,0 +1,184 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class RetryPolicy:
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=10.0):
+        """
+        重试策略：带抖动的指数退避
+        :param max_retries: 最大重试次数（不含首次尝试）
+        :param base_delay: 首次重试的基准延迟（秒）
+        :param max_delay: 单次延迟上限（秒）
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """
+        第 attempt 次失败后的等待时间（full jitter）
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+class _RetryTask:
+    def __init__(self, key, func, args, policy, expires_at, retry_on, pass_deadline=False, give_up=None):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.policy = policy
+        self.expires_at = expires_at
+        self.retry_on = retry_on
+        self.pass_deadline = pass_deadline
+        self.give_up = give_up
+        self.attempt = 0
+        self.future = Future()
+
+class RetryScheduler:
+    def __init__(self, max_workers=8):
+        """
+        重试调度器：失败的操作放入定时队列，到期后交给线程池重新执行，
+        不在调用线程中 sleep；每个操作有独立的重试计数和截止时间
+        :param max_workers: 执行重试的线程数
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='retry')
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._timer = threading.Thread(target=self._timer_loop, name='retry-timer', daemon=True)
+        self._timer.start()
+
+    def submit(self, key, func, *args, policy=None, deadline=30, retry_on=(Exception,), pass_deadline=False, give_up=None):
+        """
+        提交一个可重试的操作
+        :param key: 操作标识（用于日志）
+        :param func: 要执行的函数
+        :param policy: RetryPolicy
+        :param deadline: 整体截止时间（秒），超过后不再安排重试
+        :param retry_on: 需要重试的异常类型
+        :param pass_deadline: 为 True 时每次尝试以关键字参数 deadline 传入剩余秒数，供单次请求限制超时
+        :param give_up: 判断异常是否为永久性错误的函数，返回 True 时即使属于 retry_on 也不再重试
+        :return: concurrent.futures.Future
+        """
+        task = _RetryTask(key, func, args, policy or RetryPolicy(), time.monotonic() + deadline, retry_on, pass_deadline, give_up)
+        self._executor.submit(self._run, task)
+        return task.future
+
+    def call(self, key, func, *args, policy=None, deadline=30, retry_on=(Exception,), pass_deadline=False, give_up=None):
+        """
+        首次尝试在调用线程中执行，失败后排队重试，调用线程最多等待到截止时间
+        :return: 操作结果；最后一次失败的异常会原样抛出，超时抛出 TimeoutError
+        """
+        task = _RetryTask(key, func, args, policy or RetryPolicy(), time.monotonic() + deadline, retry_on, pass_deadline, give_up)
+        self._run(task)
+        future = task.future
+        try:
+            return future.result(timeout=max(0, task.expires_at - time.monotonic()))
+        except FutureTimeoutError:
+            # 取消排队中的重试，避免截止后继续占用资源
+            future.cancel()
+            raise TimeoutError(f"{key} did not complete within {deadline}s")
+
+    def _run(self, task):
+        if task.future.done():
+            return
+        task.attempt += 1
+        try:
+            if task.pass_deadline:
+                result = task.func(*task.args, deadline=max(0.0, task.expires_at - time.monotonic()))
+            else:
+                result = task.func(*task.args)
+        except task.retry_on as e:
+            delay = task.policy.delay(task.attempt)
+            if task.give_up and task.give_up(e):
+                self._resolve(task, exception=e)
+            elif task.attempt > task.policy.max_retries:
+                logger.error(f"Max retries ({task.policy.max_retries}) reached for {task.key}, giving up: {e}")
+                self._resolve(task, exception=e)
+            elif time.monotonic() + delay >= task.expires_at:
+                logger.error(f"Deadline reached for {task.key}, giving up: {e}")
+                self._resolve(task, exception=e)
+            else:
+                logger.info(f"Retrying {task.key} in {delay:.1f}s (attempt {task.attempt}/{task.policy.max_retries}): {e}")
+                self._schedule(task, time.monotonic() + delay)
+        except Exception as e:
+            self._resolve(task, exception=e)
+        else:
+            self._resolve(task, result=result)
+
+    def _resolve(self, task, result=None, exception=None):
+        try:
+            if exception is not None:
+                task.future.set_exception(exception)
+            else:
+                task.future.set_result(result)
+        except InvalidStateError:
+            # 调用方已超时取消
+            pass
+
+    def _schedule(self, task, due):
+        with self._cond:
+            if self._closed:
+                self._resolve(task, exception=RuntimeError(f"Retry scheduler closed before retrying {task.key}"))
+                return
+            heapq.heappush(self._queue, (due, next(self._counter), task))
+            self._cond.notify()
+
+    def _timer_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                due, _, task = self._queue[0]
+                now = time.monotonic()
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                heapq.heappop(self._queue)
+            self._executor.submit(self._run, task)
+
+    def pending(self):
+        """
+        排队等待重试的操作数
+        """
+        with self._cond:
+            return len(self._queue)
+
+    def close(self):
+        """
+        停止定时线程和线程池，排队中的重试以异常结束
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            queued = [task for _, _, task in self._queue]
+            self._queue = []
+            self._cond.notify_all()
+        for task in queued:
+            self._resolve(task, exception=RuntimeError(f"Retry scheduler closed before retrying {task.key}"))
+        self._executor.shutdown(wait=False)
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+def get_retry_scheduler():
+    """
+    获取进程内共享的重试调度器（各爬虫实例共用一个线程池和定时线程）
+    """
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = RetryScheduler()
+    return _shared_scheduler
@@ -0,0 +1,55 @@
+import threading
+from collections import Counter
+
+class SelectorCascade:
+    def __init__(self):
+        """
+        选择器级联：每次都按原优先级尝试选择器（低优先级选择器命中过也不会越过高优先级选择器，
+        否则缺少某个字段的卡片会让宽泛选择器在后续卡片上抢先命中），记录每种页面类型/字段最近命中的选择器，
+        并统计每个选择器的命中次数和回退（首选选择器未命中）次数
+        """
+        self._last = {}
+        self._hits = Counter()
+        self._fallbacks = Counter()
+        self._lock = threading.Lock()
+
+    def first(self, key, selectors, probe):
+        """
+        按优先级顺序尝试选择器
+        :param key: (页面类型, 字段)，例如 ('index', 'title')
+        :param selectors: 按优先级排列的选择器列表
+        :param probe: 对单个选择器求值的函数，返回 None 表示未命中
+        :return: 第一个命中的结果，全部未命中时返回 None
+        """
+        for position, selector in enumerate(selectors):
+            result = probe(selector)
+            if result is not None:
+                with self._lock:
+                    self._hits[(key, selector)] += 1
+                    if position > 0:
+                        self._fallbacks[key] += 1
+                    self._last[key] = selector
+                return result
+        return None
+
+    def stats(self):
+        """
+        选择器命中统计
+        :return: {'页面类型/字段': {'last': 最近命中的选择器, 'fallbacks': 回退次数, 'hits': {选择器: 次数}}}
+        """
+        with self._lock:
+            result = {}
+            for (key, selector), count in self._hits.items():
+                entry = result.setdefault('/'.join(key), {
+                    'last': self._format(self._last.get(key)),
+                    'fallbacks': self._fallbacks[key],
+                    'hits': {}
+                })
+                entry['hits'][self._format(selector)] = count
+            return result
+
+    def _format(self, selector):
+        if selector is None:
+            return None
+        tag, cls = selector
+        return f"{tag}.{cls}" if cls else tag
@@ -4,6 +4,8 @@ import sqlite3
 import json
 from datetime import datetime
 from dotenv import load_dotenv
+from date_parser import parse_published_at, wib_day_range
+from word_analysis import lemma
 
 load_dotenv()
 
@@ -126,9 +128,52 @@ class SQLiteDBManager:
             logger.error(f"Error inserting news: {e}")
             return None
     
+    def insert_news_batch(self, news_list):
+        """
+        批量插入新闻数据（单个事务）
+        已存在的 URL 只更新标题、封面和发布时间，保留已抓取的正文
+        :param news_list: 新闻数据字典列表
+        :return: 插入结果
+        """
+        try:
+            sql = '''
+                INSERT INTO news_feed 
+                (original_url, title_cn, title_id, thumbnail_r2_url, published_at, content_structure, is_crawled)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(original_url) DO UPDATE SET
+                    title_cn = excluded.title_cn,
+                    title_id = excluded.title_id,
+                    thumbnail_r2_url = excluded.thumbnail_r2_url,
+                    published_at = excluded.published_at,
+                    updated_at = CURRENT_TIMESTAMP
+            '''
+            params = [
+                (
+                    news_data.get('original_url', ''),
+                    news_data.get('title_cn', ''),
+                    news_data.get('title_id', ''),
+                    news_data.get('thumbnail_r2_url', ''),
+                    news_data.get('published_at', ''),
+                    json.dumps(news_data.get('content_structure', {})),
+                    1 if news_data.get('is_crawled', False) else 0
+                )
+                for news_data in news_list
+            ]
+            
+            with self.conn:
+                self.conn.executemany(sql, params)
+            
+            logger.info(f"Inserted {len(params)} news items in batch")
+            return {'success': True, 'data': {'count': len(params)}}
+            
+        except Exception as e:
+            logger.error(f"Error inserting news batch: {e}")
+            return None
+    
     def get_news_by_date(self, date):
         """
         根据日期获取新闻
+        published_at 为 UTC ISO 时间，日期按 detik 的 WIB 自然日换算为 UTC 范围，走 published_at 索引
         :param date: 日期字符串 (YYYY-MM-DD)
         :return: 新闻列表
         """
@@ -138,7 +183,7 @@ class SQLiteDBManager:
                 WHERE published_at >= ? AND published_at <= ?
                 ORDER BY published_at DESC
             '''
-            params = [f'{date} 00:00:00', f'{date} 23:59:59']
+            params = list(wib_day_range(date))
             
             self.cursor.execute(sql, params)
             rows = self.cursor.fetchall()
@@ -156,6 +201,99 @@ class SQLiteDBManager:
             logger.error(f"Error getting news by date: {e}")
             return []
     
+    def get_news_by_url(self, url):
+        """
+        根据原文链接获取新闻
+        :param url: 原文链接
+        :return: 新闻字典，不存在时返回 None
+        """
+        try:
+            row = self.conn.execute('SELECT * FROM news_feed WHERE original_url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+
+            news_dict = dict(row)
+            if news_dict.get('content_structure'):
+                news_dict['content_structure'] = json.loads(news_dict['content_structure'])
+            return news_dict
+
+        except Exception as e:
+            logger.error(f"Error getting news by url: {e}")
+            return None
+
+    def get_crawled_urls(self, urls):
+        """
+        获取已抓取正文的链接
+        :param urls: 链接列表
+        :return: 其中 is_crawled 为真的链接集合
+        """
+        try:
+            urls = list(urls)
+            crawled = set()
+            # 分批查询，避免超出 SQLite 参数数量上限
+            for i in range(0, len(urls), 500):
+                batch = urls[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT original_url FROM news_feed WHERE is_crawled = 1 AND original_url IN ({', '.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                crawled.update(row['original_url'] for row in rows)
+            return crawled
+
+        except Exception as e:
+            logger.error(f"Error getting crawled urls: {e}")
+            return set()
+
+    def update_news_content(self, url, content_structure):
+        """
+        保存文章正文并标记为已抓取
+        :param url: 原文链接
+        :param content_structure: 文章详情（段落、图片等）
+        :return: 更新结果，链接不存在时返回 None
+        """
+        try:
+            sql = '''
+                UPDATE news_feed SET content_structure = ?, is_crawled = 1, updated_at = CURRENT_TIMESTAMP
+                WHERE original_url = ?
+            '''
+            with self.conn:
+                cursor = self.conn.execute(sql, (json.dumps(content_structure, ensure_ascii=False), url))
+
+            if cursor.rowcount == 0:
+                return None
+            logger.info(f"Stored article content: {url}")
+            return {'success': True, 'data': {'original_url': url}}
+
+        except Exception as e:
+            logger.error(f"Error updating news content: {e}")
+            return None
+
+    def normalize_published_at(self):
+        """
+        迁移：将旧数据中的 published_at（detik 原始文本或本地 isoformat）改写为 UTC ISO 时间
+        :return: (改写的行数, 无法解析的行数)
+        """
+        try:
+            rows = self.conn.execute('SELECT id, published_at FROM news_feed').fetchall()
+            updates = []
+            unparsed = 0
+            for row in rows:
+                normalized = parse_published_at(row['published_at'])
+                if normalized is None:
+                    unparsed += 1
+                elif normalized != row['published_at']:
+                    updates.append((normalized, row['id']))
+            
+            with self.conn:
+                self.conn.executemany('UPDATE news_feed SET published_at = ? WHERE id = ?', updates)
+            
+            logger.info(f"Normalized published_at for {len(updates)} rows ({unparsed} unparsed)")
+            return len(updates), unparsed
+            
+        except Exception as e:
+            logger.error(f"Error normalizing published_at: {e}")
+            return 0, 0
+    
     def get_all_news(self, limit=100):
         """
         获取所有新闻
@@ -195,7 +333,7 @@ class SQLiteDBManager:
             params = (
                 vocab_data.get('word_selected', ''),
                 vocab_data.get('meaning_cn', ''),
-                vocab_data.get('root_word', ''),
+                vocab_data.get('root_word') or lemma(vocab_data.get('word_selected', '')),
                 vocab_data.get('pos', ''),
                 vocab_data.get('vibe_check', ''),
                 vocab_data.get('context_sentence_id', ''),
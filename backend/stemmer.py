@@ -0,0 +1,185 @@
+import re
+from functools import lru_cache
+
+# 印尼语词干提取（Nazief–Adriani 风格）：
+#   1. 去掉语气词 -lah/-kah/-tah/-pun 和物主后缀 -ku/-mu/-nya
+#   2. 依次尝试去掉派生后缀 -kan/-an/-i
+#   3. 最多去掉三层前缀 di-/ke-/se-/be(r)-/te(r)-/me(N)-/pe(N)-/per-，按鼻音变化规则还原词根首字母
+# 有词根表（本地词典）时返回第一个在词表中的候选；否则只采用无歧义的规则，并要求候选词根的开头
+# 符合印尼语音节结构（如 rdeka、mbali 不是合法词根），拿不准时返回原词而不是猜测词根
+
+PARTICLES = ('lah', 'kah', 'tah', 'pun')
+POSSESSIVES = ('nya', 'ku', 'mu')
+DERIVATIONAL_SUFFIXES = ('kan', 'an', 'i')
+# 不能同时出现的前缀 + 后缀组合
+INVALID_AFFIX_PAIRS = {('be', 'i'), ('di', 'an'), ('ke', 'i'), ('ke', 'kan'), ('me', 'an'), ('se', 'i'), ('se', 'kan'), ('te', 'an')}
+# 形似带词缀的常用虚词和词根，不做切分
+STOP_WORDS = {
+    'dengan', 'akan', 'bukan', 'tetapi', 'kami', 'kalian', 'sekarang', 'kemarin', 'karena', 'sendiri', 'pun',
+    'kemudian', 'kepada', 'kecil', 'kepala', 'kertas', 'sedang', 'sering', 'segera', 'sekolah', 'selalu',
+    'semua', 'senang', 'seperti', 'sebab', 'selamat', 'sejak'
+}
+# 词根开头允许的辅音连缀（其余情况要求首字母或第二个字母为元音）
+ONSET_CLUSTERS = {'bl', 'br', 'dr', 'fl', 'fr', 'gl', 'gr', 'kh', 'kl', 'kr', 'ng', 'ny', 'pl', 'pr',
+                  'sk', 'sl', 'sm', 'sn', 'sp', 'st', 'sw', 'sy', 'tr'}
+
+MIN_ROOT_LENGTH = 4
+VOWELS = 'aeiou'
+
+def _prefix_options(word):
+    """
+    列出去掉一层前缀的所有可能
+    :return: [(前缀类型, 剩余部分, 可信度)]，可信度 0 为首选规则，1 为首选失败时的备选，
+             2 仅在有词根表时尝试（如 memakan -> makan、memang 与 memukul -> pukul 只能靠词表区分）
+    """
+    options = []
+    def add(kind, stem, tier=0):
+        if stem:
+            options.append((kind, stem, tier))
+
+    def vowel_at(text, i):
+        return text[i:i + 1] != '' and text[i:i + 1] in VOWELS
+
+    if word.startswith(('di', 'ke', 'se')):
+        add(word[:2], word[2:])
+    elif word.startswith(('me', 'pe')):
+        kind, rest = word[:2], word[2:]
+        if rest.startswith('ny') and vowel_at(rest, 2):
+            # menyapu -> sapu，menyanyi -> nyanyi
+            add(kind, 's' + rest[2:])
+            add(kind, rest, 2)
+        elif rest.startswith('ng') and (vowel_at(rest, 2) or rest[2:3] in ('g', 'h', 'k')):
+            # mengambil -> ambil，mengatakan -> kata，menggunakan -> guna
+            add(kind, rest[2:])
+            if vowel_at(rest, 2):
+                add(kind, 'k' + rest[2:], 1)
+        elif rest.startswith('m'):
+            # membaca -> baca；mem + 元音既可能是 p 脱落（memukul -> pukul），
+            # 也可能是 m 开头的词根（memakan -> makan、memang），只能靠词表区分
+            if vowel_at(rest, 1):
+                add(kind, 'p' + rest[1:], 2)
+                add(kind, rest, 2)
+            elif rest[1:2] in ('b', 'f', 'v', 'p'):
+                add(kind, rest[1:])
+        elif rest.startswith('n'):
+            # mendengar -> dengar，menulis -> tulis，menikah -> nikah；men 只出现在 d/c/j/z/sy 之前（menteri 不切分）
+            if vowel_at(rest, 1):
+                add(kind, 't' + rest[1:])
+                add(kind, rest, 2)
+            elif rest[1:2] in ('d', 'c', 'j', 'z') or rest[1:3] == 'sy':
+                add(kind, rest[1:])
+        elif kind == 'pe' and rest.startswith('r'):
+            # pertemuan -> temu，perasaan -> rasa
+            add(kind, rest[1:])
+            if vowel_at(rest, 1):
+                add(kind, rest, 1)
+        elif rest == 'lajar':
+            add(kind, 'ajar')
+        elif rest[:1] in ('l', 'r', 'w', 'y') and vowel_at(rest, 1):
+            # melihat -> lihat，merasa -> rasa（merdeka 不切分）
+            add(kind, rest)
+    elif word.startswith(('be', 'te')):
+        kind, rest = word[:2], word[2:]
+        if rest.startswith('r'):
+            # bermain -> main，berenang -> renang
+            add(kind, rest[1:])
+            if vowel_at(rest, 1):
+                add(kind, rest, 2)
+        elif kind == 'be' and rest == 'lajar':
+            add(kind, 'ajar')
+        elif kind == 'be' and re.match(r'[^aeiou]er', rest):
+            # bekerja -> kerja，beserta -> serta
+            add(kind, rest)
+    return options
+
+def _prefix_candidates(word, suffix, max_tier, depth=0):
+    """
+    逐层去掉前缀，先产出去得最深的候选
+    :return: [(候选词根, 是否去掉了前缀)]
+    """
+    candidates = []
+    if depth < 3:
+        for kind, stem, tier in _prefix_options(word):
+            if tier > max_tier or (depth == 0 and suffix and (kind, suffix) in INVALID_AFFIX_PAIRS):
+                continue
+            candidates.extend((root, True) for root, _ in _prefix_candidates(stem, suffix, max_tier, depth + 1))
+    candidates.append((word, depth > 0))
+    return candidates
+
+def _valid_onset(root):
+    """
+    词根开头是否符合印尼语音节结构：元音开头、辅音 + 元音，或允许的辅音连缀
+    """
+    return root[:1] in VOWELS or root[1:2] in VOWELS or root[:2] in ONSET_CLUSTERS
+
+def _plausible(root):
+    return len(root) >= MIN_ROOT_LENGTH and any(c in VOWELS for c in root) and _valid_onset(root)
+
+def _candidates(word, max_tier, strict=False):
+    """
+    列出所有候选词根，按优先级排序：先去派生后缀，再逐层去前缀（深者优先），最后为原词
+    :param max_tier: 尝试的前缀规则最高可信度
+    :param strict: 没有词根表时为 True：-kan/-i 只与前缀同时去掉（menteri 不切成 menter），
+                   以 ke- 开头、-an 结尾的词只按 ke-an 切分
+    :return: [(候选词根, 是否有前缀但未能去掉)]
+    """
+    base = word
+    for particle in PARTICLES:
+        if base.endswith(particle) and _plausible(base[:-len(particle)]):
+            base = base[:-len(particle)]
+            break
+    for possessive in POSSESSIVES:
+        if base.endswith(possessive) and _plausible(base[:-len(possessive)]):
+            base = base[:-len(possessive)]
+            break
+
+    forms = [(base[:-len(suffix)], suffix) for suffix in DERIVATIONAL_SUFFIXES if base.endswith(suffix)]
+    forms.append((base, ''))
+    if base != word:
+        forms.append((word, ''))
+
+    candidates = []
+    for stem, suffix in forms:
+        has_prefix = bool(_prefix_options(stem))
+        if strict and not has_prefix and (suffix in ('kan', 'i') or (suffix == 'an' and base.endswith('kan'))):
+            continue
+        # ke-...-an 是整体的名词化词缀，不单独去掉 ke-（keadaan 不切成 adaan）
+        if strict and not suffix and stem.startswith('ke') and stem.endswith('an'):
+            continue
+        for root, stripped in _prefix_candidates(stem, suffix, max_tier):
+            candidates.append((root, has_prefix and not stripped))
+    return candidates
+
+def stem_word(word, is_root=None):
+    """
+    提取印尼语单词的词根
+    :param word: 单词（已规范化为小写）
+    :param is_root: 判断是否为已知词根的函数，提供时优先返回词表中的候选
+    :return: 词根，无法切分时返回原词
+    """
+    if not word or word in STOP_WORDS or not word.isalpha():
+        return word
+    if is_root and is_root(word):
+        return word
+
+    if is_root:
+        for root, _ in _candidates(word, max_tier=2):
+            if is_root(root):
+                return root
+    for root, unpeeled in _candidates(word, max_tier=1, strict=not is_root):
+        # 以前缀开头却去不掉前缀的候选（如 dima-kan）不可信
+        if _plausible(root) and not unpeeled:
+            return root
+    return word
+
+@lru_cache(maxsize=50000)
+def stem(word):
+    """
+    提取词根（带缓存），本地词典可用时用作词根表
+    :param word: 单词（已规范化为小写）
+    """
+    from dictionary import get_dictionary
+    dictionary = get_dictionary()
+    if dictionary:
+        return dictionary.stem(word)
+    return stem_word(word)
@@ -0,0 +1,121 @@
+import codecs
+from html.parser import HTMLParser
+
+class ArticleStreamParser(HTMLParser):
+    """
+    增量文章解析器：边接收边解析，detail__body 闭合后即标记完成，
+    调用方可以停止读取剩余的页脚、相关链接、脚本等内容
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.published_at = None
+        self.paragraphs = []
+        self.images = []
+        self.done = False
+        # 当前正在收集的元素：(字段名, 标签名, 嵌套深度, 文本缓冲)
+        self._field = None
+        self._body_depth = 0
+        self._p_text = None
+
+    def _classes(self, attrs):
+        for name, value in attrs:
+            if name == 'class' and value:
+                return value.split()
+        return []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        if self._body_depth:
+            if tag == 'div':
+                self._body_depth += 1
+            elif tag == 'p':
+                self._flush_paragraph()
+                self._p_text = []
+            elif tag == 'img':
+                src = dict(attrs).get('src')
+                if src:
+                    self.images.append(src)
+            return
+
+        if self._field:
+            if tag == self._field[1]:
+                self._field[2] += 1
+            return
+
+        classes = self._classes(attrs)
+        if tag == 'div' and 'detail__body' in classes:
+            self._body_depth = 1
+        elif tag == 'h1' and 'detail__title' in classes and self.title is None:
+            self._field = ['title', 'h1', 1, []]
+        elif tag == 'div' and 'detail__date' in classes and self.published_at is None:
+            self._field = ['published_at', 'div', 1, []]
+
+    def handle_startendtag(self, tag, attrs):
+        # <img /> 等自闭合标签没有结束标签，不影响嵌套深度
+        if tag == 'img':
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self.done:
+            return
+
+        if self._body_depth:
+            if tag == 'p':
+                self._flush_paragraph()
+            elif tag == 'div':
+                self._body_depth -= 1
+                if self._body_depth == 0:
+                    self._flush_paragraph()
+                    self.done = True
+            return
+
+        if self._field and tag == self._field[1]:
+            self._field[2] -= 1
+            if self._field[2] == 0:
+                setattr(self, self._field[0], ''.join(self._field[3]).strip())
+                self._field = None
+
+    def handle_data(self, data):
+        if self._p_text is not None:
+            self._p_text.append(data)
+        elif self._field:
+            self._field[3].append(data)
+
+    def _flush_paragraph(self):
+        if self._p_text is not None:
+            text = ''.join(self._p_text).strip()
+            if text:
+                self.paragraphs.append(text)
+            self._p_text = None
+
+def parse_article_stream(chunks, encoding='utf-8'):
+    """
+    从字节块迭代器增量解析文章，正文结束后立即停止读取
+    :param chunks: 字节块迭代器，例如 response.iter_content()
+    :param encoding: 页面编码
+    :return: (解析结果字典, 实际读取的字节)
+    """
+    parser = ArticleStreamParser()
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    received = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        received.append(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break
+    if not parser.done:
+        parser.feed(decoder.decode(b'', final=True))
+        parser.close()
+        parser._flush_paragraph()
+
+    return {
+        'title': parser.title or '',
+        'published_at': parser.published_at,
+        'paragraphs': parser.paragraphs,
+        'images': parser.images
+    }, b''.join(received)
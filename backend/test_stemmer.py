@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from stemmer import stem_word
+from word_analysis import WordAnalysisCache
+
+class StemWordTest(unittest.TestCase):
+    def test_strips_affixes(self):
+        cases = {
+            'membaca': 'baca',
+            'mendengar': 'dengar',
+            'menulis': 'tulis',
+            'menyapu': 'sapu',
+            'mengambil': 'ambil',
+            'menggunakan': 'guna',
+            'melihat': 'lihat',
+            'bermain': 'main',
+            'bekerja': 'kerja',
+            'pertemuan': 'temu',
+            'kesehatan': 'sehat',
+            'kemerdekaan': 'merdeka',
+            'diberitakan': 'berita',
+            'memberitakan': 'berita',
+            'mempelajari': 'ajar',
+            'mensyukuri': 'syukur',
+            'terjadi': 'jadi',
+            'makanan': 'makan',
+            'rumahnya': 'rumah',
+        }
+        for word, root in cases.items():
+            self.assertEqual(stem_word(word), root, word)
+
+    def test_keeps_roots_that_look_affixed(self):
+        # 没有词根表时拿不准就返回原词，不能切出 teri、mudi、rdeka 之类的错误词根
+        for word in ('menteri', 'kemudian', 'memang', 'pemerintah', 'merdeka', 'kembali', 'sedang',
+                     'memakan', 'keadaan', 'kursi'):
+            self.assertEqual(stem_word(word), word, word)
+
+    def test_root_list_resolves_ambiguous_prefixes(self):
+        roots = {'makan', 'pukul', 'perintah', 'menteri', 'memang', 'kenal', 'main'}.__contains__
+        cases = {
+            'memakan': 'makan',
+            'memukul': 'pukul',
+            'pemerintah': 'perintah',
+            'menteri': 'menteri',
+            'memang': 'memang',
+            'mengenal': 'kenal',
+            'pemain': 'main',
+        }
+        for word, root in cases.items():
+            self.assertEqual(stem_word(word, is_root=roots), root, word)
+
+    def test_leaves_function_words_and_non_words(self):
+        for word in ('dengan', 'sekarang', 'sendiri', 'covid19', ''):
+            self.assertEqual(stem_word(word), word)
+
+class WordAnalysisCacheTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.cache = WordAnalysisCache('test-model', db_path=self.db_path)
+
+    def tearDown(self):
+        self.cache.conn.close()
+        os.remove(self.db_path)
+
+    def test_keyed_by_surface_form(self):
+        self.cache.put_many([
+            ('teri', None, {'word': 'teri', 'meaning_cn': '江鱼仔'}),
+            ('belajar', None, {'word': 'belajar', 'meaning_cn': '学习'}),
+        ])
+        self.assertIsNone(self.cache.get('menteri'))
+        self.assertIsNone(self.cache.get('pelajar'))
+        self.assertEqual(self.cache.get('Belajar,')['meaning_cn'], '学习')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 提示词变化时递增，旧译文自动失效
+PROMPT_VERSION = 1
+
+class TranslationCache:
+    def __init__(self, model, db_path=None, lru_size=None, ttl_days=None, max_rows=None):
+        """
+        两级翻译缓存：进程内 LRU + SQLite 持久表
+        键为 sha256(原文, 目标语言, 模型, 提示词版本)，重复翻译不再调用 API
+        :param model: 模型名称
+        :param db_path: SQLite 文件路径，默认读取 TRANSLATION_CACHE_DB
+        :param lru_size: 进程内 LRU 条数，默认读取 TRANSLATION_CACHE_LRU_SIZE
+        :param ttl_days: 译文有效期（天），默认读取 TRANSLATION_CACHE_TTL_DAYS
+        :param max_rows: 持久表最大条数，超出时淘汰最久未使用的，默认读取 TRANSLATION_CACHE_MAX_ROWS
+        """
+        self.model = model
+        self.db_path = db_path or os.getenv('TRANSLATION_CACHE_DB', 'translation_cache.db')
+        self.lru_size = lru_size or int(os.getenv('TRANSLATION_CACHE_LRU_SIZE', 5000))
+        self.ttl = (ttl_days or float(os.getenv('TRANSLATION_CACHE_TTL_DAYS', 90))) * 86400
+        self.max_rows = max_rows or int(os.getenv('TRANSLATION_CACHE_MAX_ROWS', 200000))
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.lru_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS translation_cache (
+                    key TEXT PRIMARY KEY,
+                    translation TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_translation_cache_last_used ON translation_cache(last_used)')
+        self.purge()
+
+    def key(self, text, target_language, model=None):
+        raw = '\0'.join([model or self.model, str(PROMPT_VERSION), target_language, text])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _remember(self, key, translation):
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, text, target_language, model=None):
+        """
+        查询译文
+        :param model: 查询哪个模型的译文，默认为 self.model
+        :return: 译文，未命中或已过期时返回 None
+        """
+        key = self.key(text, target_language, model)
+        with self._lock:
+            translation = self._lru.get(key)
+            if translation is not None:
+                self._lru.move_to_end(key)
+                self.lru_hits += 1
+                return translation
+
+            now = time.time()
+            row = self.conn.execute(
+                'SELECT translation, created_at FROM translation_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or row[1] < now - self.ttl:
+                self.misses += 1
+                return None
+
+            with self.conn:
+                self.conn.execute('UPDATE translation_cache SET last_used = ? WHERE key = ?', (now, key))
+            self._remember(key, row[0])
+            self.db_hits += 1
+            return row[0]
+
+    def put(self, text, target_language, translation, model=None):
+        self.put_many([(text, translation)], target_language, model)
+
+    def put_many(self, pairs, target_language, model=None):
+        """
+        批量写入译文
+        :param pairs: (原文, 译文) 列表
+        :param model: 译文由哪个模型给出，默认为 self.model
+        """
+        now = time.time()
+        rows = [(self.key(text, target_language, model), translation, now, now) for text, translation in pairs if translation]
+        if not rows:
+            return
+        with self._lock:
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO translation_cache (key, translation, created_at, last_used) VALUES (?, ?, ?, ?)',
+                    rows
+                )
+            for key, translation, _, _ in rows:
+                self._remember(key, translation)
+            self._puts += len(rows)
+            should_purge = self._puts >= 1000
+            if should_purge:
+                self._puts = 0
+        if should_purge:
+            self.purge()
+
+    def purge(self):
+        """
+        删除过期译文，并在超出 max_rows 时淘汰最久未使用的条目
+        """
+        with self._lock:
+            with self.conn:
+                expired = self.conn.execute(
+                    'DELETE FROM translation_cache WHERE created_at < ?', (time.time() - self.ttl,)
+                ).rowcount
+                count = self.conn.execute('SELECT COUNT(*) FROM translation_cache').fetchone()[0]
+                evicted = 0
+                if count > self.max_rows:
+                    evicted = self.conn.execute('''
+                        DELETE FROM translation_cache WHERE key IN (
+                            SELECT key FROM translation_cache ORDER BY last_used LIMIT ?
+                        )
+                    ''', (count - self.max_rows,)).rowcount
+        if expired or evicted:
+            logger.info(f"Translation cache purged {expired} expired and {evicted} least recently used entries")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.lru_hits + self.db_hits + self.misses
+            return {
+                'lru_hits': self.lru_hits,
+                'db_hits': self.db_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.lru_hits + self.db_hits) / lookups, 3) if lookups else None,
+                'lru_size': len(self._lru)
+            }
@@ -0,0 +1,14 @@
+class CrawlSession:
+    def __init__(self):
+        """
+        单次抓取的去重作用域：同一次抓取内（跨分页）URL 只出现一次，
+        不同请求之间互不影响，抓取结束后随作用域释放，内存不随运行时间增长
+        跨抓取的进度（哪些 URL 已抓取、已翻译、已入库）由 CrawlFrontier 持久记录
+        """
+        self.urls = set()
+
+    def is_new(self, url):
+        return url not in self.urls
+
+    def add(self, url):
+        self.urls.add(url)
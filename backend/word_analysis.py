@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+
+from batch_translation import MAX_OUTPUT_TOKENS
+from stemmer import stem
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 分析提示词、结果字段或缓存键变化时递增，旧结果自动失效
+ANALYSIS_VERSION = 2
+# 单次批量分析请求的单词数上限（每条结果约 150 个输出 token）
+ANALYSIS_BATCH_SIZE = 20
+ANALYSIS_FIELDS = ('meaning_cn', 'root_word', 'pos', 'vibe_check')
+
+def normalize_word(word):
+    """
+    规范化单词：去掉首尾标点和空白，转为小写
+    """
+    return re.sub(r'^[^\w]+|[^\w]+$', '', (word or '').strip()).lower()
+
+def lemma(word):
+    """
+    规范化后提取词根，模型未给出 root_word 时用于补全（不作为缓存键：不同派生词的释义不同）
+    """
+    return stem(normalize_word(word))
+
+def context_key(context):
+    """
+    上下文键：合并空白、转小写后取哈希，无上下文时为空字符串
+    """
+    text = ' '.join((context or '').split()).lower()
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16] if text else ''
+
+def build_analysis_prompt(items):
+    """
+    构造批量单词分析提示词：输入为带编号的 JSON 数组，要求输出等长的 JSON 数组
+    :param items: (单词, 上下文) 列表
+    """
+    payload = [{'id': i + 1, 'word': word, 'context': context or ''} for i, (word, context) in enumerate(items)]
+    return (
+        f"请分析下面 JSON 数组中的每个印尼语单词（context 为单词所在的原句，可能为空）。\n"
+        f"只输出一个 JSON 数组，共 {len(items)} 个元素，格式为 "
+        f"[{{\"id\": 编号, \"meaning_cn\": \"中文释义\", \"root_word\": \"词根\", \"pos\": \"词性\", "
+        f"\"vibe_check\": \"用法说明（语感、使用场景等）\", \"example\": \"例句（有上下文时使用原句）\"}}]，"
+        f"编号与输入一一对应，不要输出其他内容。\n\n"
+        f"{json.dumps(payload, ensure_ascii=False)}"
+    )
+
+def analysis_max_tokens(items):
+    return min(MAX_OUTPUT_TOKENS, 160 * len(items) + 64)
+
+def parse_analysis_response(content, items):
+    """
+    将批量分析结果映射回输入顺序
+    :param content: 模型输出
+    :param items: (单词, 上下文) 列表
+    :return: 长度与 items 相同的分析结果列表，无法解析的位置为 None
+    """
+    results = [None] * len(items)
+    if not content:
+        return results
+
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', content.strip())
+    start, end = text.find('['), text.rfind(']')
+    try:
+        parsed = json.loads(text[start:end + 1]) if start != -1 and end > start else None
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, list):
+        return results
+
+    for position, entry in enumerate(parsed):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            index = int(entry.get('id')) - 1
+        except (TypeError, ValueError):
+            index = position
+        if not 0 <= index < len(items) or results[index] is not None or not entry.get('meaning_cn'):
+            continue
+        word, context = items[index]
+        analysis = {'word': word}
+        for field in ANALYSIS_FIELDS:
+            analysis[field] = str(entry.get(field) or '').strip()
+        analysis['root_word'] = analysis['root_word'] or lemma(word)
+        analysis['context_sentence_id'] = context or str(entry.get('example') or '').strip()
+        results[index] = analysis
+    return results
+
+class WordAnalysisCache:
+    def __init__(self, model, db_path=None, lru_size=None):
+        """
+        单词分析缓存：进程内 LRU + SQLite 持久表
+        每个单词按规范化后的原形保存一条通用结果，带上下文的结果按上下文另存一条
+        （pelajar 与 belajar 词根相同但释义不同，不能按词根共用）
+        :param model: 模型名称
+        :param db_path: SQLite 文件路径，默认读取 WORD_ANALYSIS_CACHE_DB
+        :param lru_size: 进程内 LRU 条数，默认读取 WORD_ANALYSIS_CACHE_LRU_SIZE
+        """
+        self.model = model
+        self.db_path = db_path or os.getenv('WORD_ANALYSIS_CACHE_DB', 'word_analysis_cache.db')
+        self.lru_size = lru_size or int(os.getenv('WORD_ANALYSIS_CACHE_LRU_SIZE', 20000))
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.context_hits = 0
+        self.word_hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS word_analysis (
+                    word TEXT NOT NULL,
+                    context_key TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    version INTEGER NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (word, context_key, model, version)
+                )
+            ''')
+
+    def _lookup(self, word, ctx, model):
+        key = (word, ctx, model)
+        analysis = self._lru.get(key)
+        if analysis is not None:
+            self._lru.move_to_end(key)
+            return analysis
+        row = self.conn.execute(
+            'SELECT analysis FROM word_analysis WHERE word = ? AND context_key = ? AND model = ? AND version = ?',
+            (word, ctx, model, ANALYSIS_VERSION)
+        ).fetchone()
+        if row is None:
+            return None
+        analysis = json.loads(row[0])
+        self._remember(key, analysis)
+        return analysis
+
+    def _remember(self, key, analysis):
+        self._lru[key] = analysis
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, word, context=None, model=None):
+        """
+        查询分析结果：优先返回该上下文的结果，其次返回单词的通用结果
+        :param model: 查询哪个模型的结果，默认为 self.model
+        :return: 分析结果（副本），未命中时返回 None
+        """
+        normalized = normalize_word(word)
+        if not normalized:
+            return None
+        ctx = context_key(context)
+        model = model or self.model
+        with self._lock:
+            analysis = self._lookup(normalized, ctx, model) if ctx else None
+            if analysis is not None:
+                self.context_hits += 1
+            else:
+                analysis = self._lookup(normalized, '', model)
+                if analysis is None:
+                    self.misses += 1
+                    return None
+                self.word_hits += 1
+
+        result = dict(analysis, word=word)
+        if context:
+            result['context_sentence_id'] = context
+        return result
+
+    def put_many(self, entries, model=None):
+        """
+        批量写入分析结果；带上下文的结果同时写入上下文条目，并在没有通用条目时作为通用结果
+        :param entries: (单词, 上下文, 分析结果) 列表
+        :param model: 结果由哪个模型给出，默认为 self.model
+        """
+        now = time.time()
+        model = model or self.model
+        rows = []
+        for word, context, analysis in entries:
+            normalized = normalize_word(word)
+            if not normalized or not analysis:
+                continue
+            payload = json.dumps(analysis, ensure_ascii=False)
+            ctx = context_key(context)
+            if ctx:
+                rows.append(('INSERT OR REPLACE', normalized, ctx, payload))
+            rows.append(('INSERT OR IGNORE' if ctx else 'INSERT OR REPLACE', normalized, '', payload))
+        if not rows:
+            return
+
+        with self._lock:
+            with self.conn:
+                for verb, normalized, ctx, payload in rows:
+                    cursor = self.conn.execute(
+                        f'{verb} INTO word_analysis (word, context_key, model, version, analysis, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                        (normalized, ctx, model, ANALYSIS_VERSION, payload, now)
+                    )
+                    if cursor.rowcount:
+                        self._remember((normalized, ctx, model), json.loads(payload))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.context_hits + self.word_hits + self.misses
+            return {
+                'context_hits': self.context_hits,
+                'word_hits': self.word_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.context_hits + self.word_hits) / lookups, 3) if lookups else None,
+                'lru_size': len(self._lru)
+            }
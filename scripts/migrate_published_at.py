@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+published_at 迁移脚本
+将 news_feed 中 detik 原始日期文本（如 "Senin, 13 Okt 2025 10:00 WIB"）和本地 isoformat
+统一改写为 UTC ISO 时间，使按日期查询能命中 idx_news_feed_published_at
+
+用法：python scripts/migrate_published_at.py [--db backend/news_data.db]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from sqlite_db import SQLiteDBManager
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize news_feed.published_at to UTC ISO timestamps')
+    parser.add_argument('--db', default='backend/news_data.db', help='SQLite database path')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ 错误：找不到数据库文件：{args.db}")
+        sys.exit(1)
+
+    db_manager = SQLiteDBManager(args.db)
+    updated, unparsed = db_manager.normalize_published_at()
+    db_manager.close()
+
+    print(f"✅ 已改写 {updated} 行 published_at")
+    if unparsed:
+        print(f"⚠️  {unparsed} 行无法解析，保持原值")
+
+if __name__ == "__main__":
+    main()